@@ -78,6 +78,14 @@ if __name__ == "__main__":
         help=f"The proportions for splits {SPLITS}. These values will be normalized.",
     )
 
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="The number of processes to use to parse the pieces.",
+    )
+
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -150,6 +158,7 @@ if __name__ == "__main__":
         xml_and_csv_paths=xmls_and_csvs,
         splits=ARGS.splits,
         seed=ARGS.seed,
+        num_workers=ARGS.workers,
     )
 
     os.makedirs(Path(ARGS.output), exist_ok=True)
@@ -31,7 +31,7 @@ from harmonic_inference.utils.harmonic_utils import (
     tpc_interval_to_midi_interval,
     transpose_pitch,
 )
-from harmonic_inference.utils.rhythmic_utils import get_metrical_level
+from harmonic_inference.utils.rhythmic_utils import get_measure, get_metrical_level
 
 
 class Chord:
@@ -359,6 +359,34 @@ class Chord:
                 return False
         return True
 
+    def repetition_key(
+        self, use_inversion: bool = True, use_suspension: bool = False
+    ) -> Tuple[Union[int, str], ...]:
+        """
+        Get a tuple of the attributes checked by is_repeated(...), such that (for two Chords)
+        chord.is_repeated(other, **kwargs) if and only if
+        chord.repetition_key(**kwargs) == other.repetition_key(**kwargs).
+
+        Parameters
+        ----------
+        use_inversion : bool
+            True to take inversions into account. False otherwise.
+        use_suspension : bool
+            True to take suspensions into account. False otherwise.
+
+        Returns
+        -------
+        repetition_key : Tuple[Union[int, str], ...]
+            The pitch_type, root, and chord_type of this chord, plus optionally its inversion
+            and suspension. Every value is an int, except the suspension (a str or None).
+        """
+        key = (self.pitch_type.value, self.root, self.chord_type.value)
+        if use_inversion:
+            key += (self.inversion,)
+        if use_suspension:
+            key += (self.suspension,)
+        return key
+
     def merge_with(self, next_chord: "Chord"):
         """
         Merge this chord with the next one, in terms of metrical information. Specifically,
@@ -419,8 +447,8 @@ class Chord:
 
     @staticmethod
     def from_series(
-        chord_row: pd.Series,
-        measures_df: pd.DataFrame,
+        chord_row: Union[pd.Series, Dict],
+        measures_df: Union[pd.DataFrame, Dict[int, Dict]],
         pitch_type: PitchType,
         reduction: Dict[ChordType, ChordType] = NO_REDUCTION,
         use_inversion: bool = True,
@@ -433,8 +461,9 @@ class Chord:
 
         Parameters
         ----------
-        chord_row : pd.Series
-            The chord row from which to make our chord object. It must contain at least the rows:
+        chord_row : Union[pd.Series, Dict]
+            The chord row from which to make our chord object (a pd.Series or a dict of one,
+            e.g., from DataFrame.to_dict("records")). It must contain at least the rows:
                 'numeral' (str): The numeral of the chord label. If this is null or '@none',
                                  None is returned.
                 'root' (int): The interval of the root note above the local key tonic, in TPC.
@@ -458,11 +487,12 @@ class Chord:
                 'onset_next' (Fraction): The chord's offset beat, in whole notes.
                 'duration' (Fraction): The chord's duration, in whole notes.
                 'changes' (str): Any suspensions or altered tones in this chord.
-        measures_df : pd.DataFrame
+        measures_df : Union[pd.DataFrame, Dict[int, Dict]]
             A pd.DataFrame of the measures in the piece of the chord. It is used to get metrical
             levels of the chord's onset and offset. Must have at least the columns:
                 'mc' (int): The measure number, to match with the chord's onset and offset.
                 'timesig' (str): The time signature of the measure.
+            A Dict from rhythmic_utils.get_measures_dict(...) is also accepted.
         pitch_type : PitchType
             The pitch type to use for the Chord.
         reduction : Dict[ChordType, ChordType]
@@ -524,7 +554,7 @@ class Chord:
                     [chord_row[CHORD_ONSET_BEAT], chord_row[f"{CHORD_ONSET_BEAT}_next"]],
                 )
             ):
-                measure = measures_df.loc[measures_df["mc"] == mc].squeeze()
+                measure = get_measure(measures_df, mc)
 
                 if levels_cache is None:
                     level = get_metrical_level(beat, measure)
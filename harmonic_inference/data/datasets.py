@@ -1,6 +1,7 @@
 """Module containing datasets for the various models."""
 import logging
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
 
@@ -32,9 +33,27 @@ from harmonic_inference.utils.harmonic_utils import (
     get_bass_note,
     get_chord_from_one_hot_index,
     get_chord_one_hot_index,
+    get_chord_one_hot_indexes,
     get_vector_from_chord_type,
 )
 
+# Every target is a chord or key one-hot index (or -100, to be ignored), all of which fit in
+# 16 bits. Lengths fit in 32 bits. The models cast both to long themselves.
+TARGET_DTYPE = np.int16
+LENGTH_DTYPE = np.int32
+
+# Padded item size (in values) above which pad_array copies each item separately rather than
+# all items at once through a boolean mask, which has a high per-value cost.
+PAD_ROW_COPY_MIN_SIZE = 128
+
+# Chunk cache settings for reading h5 files. The default (1 MiB) is smaller than many of our
+# chunks, which would then be decompressed again on every read. rdcc_nslots should be prime.
+H5_CHUNK_CACHE_KWARGS = {
+    "rdcc_nbytes": 64 * 1024 * 1024,
+    "rdcc_nslots": 1000003,
+    "rdcc_w0": 0.75,
+}
+
 
 class HarmonicDataset(Dataset):
     """
@@ -84,6 +103,206 @@ class HarmonicDataset(Dataset):
 
         self.hidden_states = None
 
+        self._h5_file = None
+        self._h5_datasets = {}
+        self._h5_lengths = {}
+        self._h5_offsets = {}
+        self._h5_max_lengths = {}
+        self._h5_batches = {}
+        self._h5_last_items = {}
+        self._h5_prefetched = {}
+        self._length = None
+
+    def __getstate__(self) -> Dict:
+        # Open h5py File and Dataset handles cannot be pickled. Drop them so that each
+        # DataLoader worker re-opens its own handles on first access.
+        state = self.__dict__.copy()
+        state["_h5_file"] = None
+        state["_h5_datasets"] = {}
+        state["_h5_batches"] = {}
+        state["_h5_last_items"] = {}
+        del state["_get_data"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self.in_ram = self._in_ram
+        self._h5_file = None
+        self._h5_datasets = {}
+        self._h5_batches = {}
+        self._h5_last_items = {}
+
+    @property
+    def in_ram(self) -> bool:
+        """
+        Whether this dataset's data is held in RAM (True) or read from self.h5_path (False).
+        Setting this also sets the method with which __getitem__ loads each data point, so
+        that __getitem__ itself does not need to check it.
+        """
+        return self._in_ram
+
+    @in_ram.setter
+    def in_ram(self, in_ram: bool):
+        self._in_ram = in_ram
+        self._get_data = self.get_ram_data if in_ram else self.get_h5_data
+
+    def get_h5_file(self) -> h5py.File:
+        """
+        Get an open, read-only handle to this dataset's h5 file (self.h5_path). The file is
+        opened lazily on the first call and the handle is reused for every subsequent read.
+
+        On opening, direct references to the file's datasets are stored in self._h5_datasets,
+        and the (small) length and offset arrays are read fully into memory in self._h5_lengths
+        and self._h5_offsets, so that __getitem__ needs no group lookups and no separate h5
+        reads for lengths.
+
+        Returns
+        -------
+        h5_file : h5py.File
+            An open h5py File object of this dataset's h5_path.
+        """
+        assert self.h5_path is not None, "Data must be either in ram or in an h5_file."
+        if self._h5_file is None:
+            self._h5_file = h5py.File(self.h5_path, "r", swmr=True, **H5_CHUNK_CACHE_KWARGS)
+            self._h5_datasets = {key: self._h5_file[key] for key in self._h5_file}
+            self._h5_lengths = {
+                key: self._h5_file[key][:]
+                for key in ["input_lengths", "target_lengths"]
+                if key in self._h5_file
+            }
+            self._h5_offsets = {
+                key: self._h5_file[f"{key}_offsets"][:]
+                for key in ["inputs", "targets"]
+                if f"{key}_offsets" in self._h5_file
+            }
+            self._h5_max_lengths = {
+                key: int(np.max(np.diff(offsets), initial=0))
+                for key, offsets in self._h5_offsets.items()
+            }
+        return self._h5_file
+
+    def close_h5_file(self):
+        """
+        Close this dataset's h5 file handle, if it is open.
+        """
+        if self._h5_file is not None:
+            self._h5_file.close()
+            self._h5_file = None
+            self._h5_datasets = {}
+            self._h5_offsets = {}
+            self._h5_max_lengths = {}
+            self._h5_batches = {}
+            self._h5_last_items = {}
+
+    def read_h5_padded(self, key: str, item) -> np.array:
+        """
+        Read the (padded) data point(s) at the given index of the given h5 dataset. If item is
+        a single integer and the dataset's lengths are known, only the non-padded prefix is read
+        from the h5 file, and the rest of the returned array is filled with zeros.
+
+        If the data is stored in the ragged layout written by to_h5 (f"{key}_data" and
+        f"{key}_offsets"), it is read with read_h5_ragged(key, item) instead.
+
+        When single integer items are read sequentially, the next self.chunk_size rows are read
+        at once and kept in memory, and following items are served from there until the index
+        leaves that batch.
+
+        Parameters
+        ----------
+        key : str
+            The h5 dataset to read from ("inputs" or "targets").
+        item : Indexer
+            Some type of indexer which can index into an h5py Dataset.
+
+        Returns
+        -------
+        data : np.array
+            The padded data at the given index of the given h5 dataset.
+        """
+        self.get_h5_file()
+        if isinstance(item, (int, np.integer)) and item in self._h5_prefetched.get(key, {}):
+            return self._h5_prefetched[key][item].copy()
+
+        if key in self._h5_offsets:
+            return self.read_h5_ragged(key, item)
+
+        dataset = self._h5_datasets[key]
+        lengths = self._h5_lengths.get(f"{key[:-1]}_lengths")
+
+        if not isinstance(item, (int, np.integer)):
+            return dataset[item]
+
+        is_sequential = self._h5_last_items.get(key) == item - 1
+        self._h5_last_items[key] = item
+
+        start, end, batch = self._h5_batches.get(key, (0, 0, None))
+        if start <= item < end:
+            return batch[item - start].copy()
+
+        if is_sequential:
+            end = min(item + self.chunk_size, len(dataset))
+            self._h5_batches[key] = (item, end, dataset[item:end])
+            return self._h5_batches[key][2][0].copy()
+
+        if lengths is None:
+            return dataset[item]
+
+        length = lengths[item]
+        padded = np.zeros(dataset.shape[1:], dtype=dataset.dtype)
+        padded[:length] = dataset[item, :length]
+        return padded
+
+    def read_h5_ragged(self, key: str, item) -> np.array:
+        """
+        Read the data point(s) at the given index of the given ragged h5 data: the items
+        concatenated along their first dimension in f"{key}_data", with item i stored in rows
+        f"{key}_offsets"[i] through f"{key}_offsets"[i + 1]. Each item is read with a single
+        contiguous h5 read, and is returned padded with zeros to the length of the longest item.
+
+        As in read_h5_padded, sequentially read items are served from an in-memory batch of
+        the next self.chunk_size items.
+
+        Parameters
+        ----------
+        key : str
+            The data to read ("inputs" or "targets").
+        item : Indexer
+            Some type of indexer which can index into a numpy array.
+
+        Returns
+        -------
+        data : np.array
+            The padded data at the given index.
+        """
+        self.get_h5_file()
+        dataset = self._h5_datasets[f"{key}_data"]
+        offsets = self._h5_offsets[key]
+
+        if not isinstance(item, (int, np.integer)):
+            return np.stack(
+                [self.read_h5_ragged(key, index) for index in np.arange(len(offsets) - 1)[item]]
+            )
+
+        start, end = offsets[item], offsets[item + 1]
+        padded = np.zeros((self._h5_max_lengths[key],) + dataset.shape[1:], dtype=dataset.dtype)
+
+        is_sequential = self._h5_last_items.get(key) == item - 1
+        self._h5_last_items[key] = item
+
+        batch_start, batch_end, batch = self._h5_batches.get(key, (0, 0, None))
+        if not batch_start <= item < batch_end:
+            if not is_sequential:
+                padded[: end - start] = dataset[start:end]
+                return padded
+
+            batch_start, batch_end = item, min(item + self.chunk_size, len(offsets) - 1)
+            batch = dataset[offsets[batch_start] : offsets[batch_end]]
+            self._h5_batches[key] = (batch_start, batch_end, batch)
+
+        batch_offset = offsets[batch_start]
+        padded[: end - start] = batch[start - batch_offset : end - batch_offset]
+        return padded
+
     def finalize_data(
         self,
         data: Dict[str, np.array],
@@ -162,8 +381,13 @@ class HarmonicDataset(Dataset):
             The number of data points in this dataset.
         """
         if not self.in_ram:
-            with h5py.File(self.h5_path, "r") as h5_file:
-                return len(h5_file["inputs"])
+            if self._length is None:
+                self.get_h5_file()
+                if "inputs" in self._h5_offsets:
+                    self._length = len(self._h5_offsets["inputs"]) - 1
+                else:
+                    self._length = len(self._h5_datasets["inputs"])
+            return self._length
         return len(self.inputs)
 
     def __getitem__(self, item, transposition: int = None) -> Dict:
@@ -185,41 +409,171 @@ class HarmonicDataset(Dataset):
             inputs, input_lengths, targets, target_legnths, and hidden_states, if these
             are attributes of the dataset object.
         """
-        if not self.in_ram:
-            assert self.h5_path is not None, "Data must be either in ram or in an h5_file."
-            with h5py.File(self.h5_path, "r") as h5_file:
-                data = {
-                    key: h5_file[key][item]
-                    for key in ["inputs", "targets", "input_lengths", "target_lengths"]
-                    if key in h5_file
-                }
+        return self.finalize_data(self._get_data(item), item, transposition=transposition)
 
+    def __getitems__(self, items: List[int]) -> List[Dict]:
+        """
+        Get many items from this dataset at once (this is used by torch DataLoaders to
+        fetch whole batches).
+
+        When reading from an h5 file, the rows needed by all of the given items are first
+        read in sorted order, with a single h5 read per dataset when possible, so that each
+        chunk touched by the batch is decompressed only once. Each item is then created
+        from those rows by __getitem__.
+
+        Parameters
+        ----------
+        items : List[int]
+            The indexes of the items to get.
+
+        Returns
+        -------
+        data : List[Dict]
+            The data point of each given item, as returned by __getitem__.
+        """
+        if self.in_ram or len(items) == 0:
+            return [self[item] for item in items]
+
+        self.get_h5_file()
+        rows = np.unique([self.get_h5_row(item) for item in items])
+
+        self._h5_prefetched = {
+            key: dict(zip(rows, self.read_h5_rows(key, rows)))
+            for key in ["inputs", "targets"]
+            if key in self._h5_datasets or key in self._h5_offsets
+        }
+
+        try:
+            return [self[item] for item in items]
+        finally:
+            self._h5_prefetched = {}
+
+    def get_h5_row(self, item: int) -> int:
+        """
+        Get the index of the row of the h5 inputs and targets which hold the given item.
+
+        Parameters
+        ----------
+        item : int
+            The index of an item of this dataset.
+
+        Returns
+        -------
+        row : int
+            The h5 row from which the given item is created.
+        """
+        return item
+
+    def read_h5_rows(self, key: str, rows: np.array) -> List[np.array]:
+        """
+        Read the given rows of the given h5 data at once, each padded as by read_h5_padded.
+
+        Parameters
+        ----------
+        key : str
+            The data to read ("inputs" or "targets").
+        rows : np.array
+            The rows to read, sorted and unique.
+
+        Returns
+        -------
+        data : List[np.array]
+            The padded data of each given row.
+        """
+        if key not in self._h5_offsets:
+            # h5py reads an increasing list of rows in a single call
+            return list(self._h5_datasets[key][list(rows)])
+
+        dataset = self._h5_datasets[f"{key}_data"]
+        offsets = self._h5_offsets[key]
+        starts, ends = offsets[rows], offsets[rows + 1]
+
+        padded = np.zeros(
+            (len(rows), self._h5_max_lengths[key]) + dataset.shape[1:], dtype=dataset.dtype
+        )
+
+        if ends[-1] - starts[0] <= 2 * np.sum(ends - starts):
+            # Dense enough: read the whole span at once
+            span = dataset[starts[0] : ends[-1]]
+            for padded_row, start, end in zip(padded, starts - starts[0], ends - starts[0]):
+                padded_row[: end - start] = span[start:end]
         else:
-            data = {"inputs": self.inputs[item]}
-
-            # During inference, we have no targets
-            if self.targets is not None:
-                data["targets"] = self.targets[item]
-
-            if self.input_lengths is not None:
-                if self.max_input_length is None:
-                    self.max_input_length = np.max(self.input_lengths)
-                padded_input = np.zeros(([self.max_input_length] + list(data["inputs"][0].shape)))
-                padded_input[: len(data["inputs"])] = data["inputs"]
-                data["inputs"] = padded_input
-                data["input_lengths"] = self.input_lengths[item]
-
-            if self.target_lengths is not None:
-                if self.max_target_length is None:
-                    self.max_target_length = np.max(self.target_lengths)
-                padded_target = np.zeros(
-                    ([self.max_target_length] + list(data["targets"][0].shape))
-                )
-                padded_target[: len(data["targets"])] = data["targets"]
-                data["targets"] = padded_target
-                data["target_lengths"] = self.target_lengths[item]
+            for padded_row, start, end in zip(padded, starts, ends):
+                padded_row[: end - start] = dataset[start:end]
+
+        return list(padded)
+
+    def get_h5_data(self, item) -> Dict:
+        """
+        Load the given item (or range of items) from this dataset's h5 file, before any
+        reduction or transformation.
+
+        Parameters
+        ----------
+        item : Indexer
+            Some type of indexer which can index into lists and numpy arrays.
+
+        Returns
+        -------
+        data : Dict
+            The padded inputs and targets at the given index, as well as any lengths stored
+            in the h5 file.
+        """
+        self.get_h5_file()
+        data = {
+            key: self.read_h5_padded(key, item)
+            for key in ["inputs", "targets"]
+            if key in self._h5_datasets or key in self._h5_offsets
+        }
+        data.update({key: lengths[item] for key, lengths in self._h5_lengths.items()})
+        return data
+
+    def get_ram_data(self, item) -> Dict:
+        """
+        Load the given item from this dataset's in-RAM data, before any reduction or
+        transformation.
+
+        Parameters
+        ----------
+        item : Indexer
+            Some type of indexer which can index into lists and numpy arrays.
+
+        Returns
+        -------
+        data : Dict
+            The inputs and targets at the given index. If this dataset has input_lengths and
+            target_lengths, these are included, and the inputs and targets are padded to the
+            maximum length.
+        """
+        data = {"inputs": self.inputs[item]}
 
-        return self.finalize_data(data, item, transposition=transposition)
+        # During inference, we have no targets
+        if self.targets is not None:
+            data["targets"] = self.targets[item]
+
+        if self.input_lengths is not None:
+            if self.max_input_length is None:
+                self.max_input_length = np.max(self.input_lengths)
+            padded_input = np.zeros(
+                ([self.max_input_length] + list(data["inputs"][0].shape)),
+                dtype=data["inputs"].dtype,
+            )
+            padded_input[: len(data["inputs"])] = data["inputs"]
+            data["inputs"] = padded_input
+            data["input_lengths"] = self.input_lengths[item]
+
+        if self.target_lengths is not None:
+            if self.max_target_length is None:
+                self.max_target_length = np.max(self.target_lengths)
+            padded_target = np.zeros(
+                ([self.max_target_length] + list(data["targets"][0].shape)),
+                dtype=data["targets"].dtype,
+            )
+            padded_target[: len(data["targets"])] = data["targets"]
+            data["targets"] = padded_target
+            data["target_lengths"] = self.target_lengths[item]
+
+        return data
 
     def pad(self):
         """
@@ -228,7 +582,8 @@ class HarmonicDataset(Dataset):
         (with 0's padded to the end).
 
         This function works if input and target are lists of np.ndarrays, and the ndarrays match
-        in every dimension except possibly the first.
+        in every dimension except possibly the first. Inputs or targets which are already stacked
+        into a single (non-object) nd-array are not re-padded.
 
         This also adds fields input_lengths and target_lengths (both arrays, with 1 integer per
         input and target), representing the lengths of the non-padded entries for each piece.
@@ -238,24 +593,39 @@ class HarmonicDataset(Dataset):
         if self.padded:
             return
 
-        if self.pad_targets:
+        if self.pad_targets and not is_stacked(self.targets):
             self.targets, target_lengths = pad_array(self.targets)
             if self.save_padded_target_lengths:
                 self.target_lengths = target_lengths
 
-        if self.pad_inputs:
+        if self.pad_inputs and not is_stacked(self.inputs):
             self.inputs, input_lengths = pad_array(self.inputs)
             if self.save_padded_input_lengths:
                 self.input_lengths = input_lengths
 
         self.padded = True
 
-    def to_h5(self, h5_path: Union[str, Path], file_ids: Iterable[int] = None):
+    def to_h5(
+        self,
+        h5_path: Union[str, Path],
+        file_ids: Iterable[int] = None,
+        chunks: Dict[str, Tuple[int, ...]] = None,
+        compression: str = "lzf",
+        shuffle: bool = True,
+    ):
         """
         Write this HarmonicDataset out to an h5 file, containing its inputs and targets.
         If the dataset is already being read from an h5py file, this simply copies that
         file (self.h5_path) over to the given location and updates self.h5_path.
 
+        Inputs and targets which would be padded by self.pad() are instead written without
+        padding, in a ragged layout (see write_ragged_h5_dataset): f"{key}_data" holds all of
+        the items concatenated along their first dimension, and f"{key}_offsets" holds the
+        index in f"{key}_data" at which each item starts (plus a final entry for the total
+        length). These are streamed to the file, so no padded or concatenated copy of the
+        data is built in memory.
+        Already-stacked inputs and targets are written as is, to f"{key}".
+
         Parameters
         ----------
         h5_path : Union[str, Path]
@@ -263,6 +633,16 @@ class HarmonicDataset(Dataset):
         file_ids : Iterable[int]
             The file_ids of the pieces in this dataset. Will be added to the h5 file as `file_ids`
             if given.
+        chunks : Dict[str, Tuple[int, ...]]
+            A mapping of h5 dataset names (e.g., "inputs") to the chunk shape to use for that
+            dataset, overriding the defaults from get_default_h5_chunks(...).
+        compression : str
+            The h5py compression filter to use for every dataset. The default, "lzf", is
+            built into h5py and decompresses much faster than "gzip" during data loading.
+            Use "gzip" if a smaller file size is more important than read speed.
+        shuffle : bool
+            True to apply the h5 byte-shuffle filter before compression, which typically
+            improves the compression ratio (especially for float data) at little cost.
         """
         if isinstance(h5_path, str):
             h5_path = Path(h5_path)
@@ -270,22 +650,37 @@ class HarmonicDataset(Dataset):
         if not h5_path.parent.exists():
             h5_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if not self.padded:
-            self.pad()
-
         if self.h5_path:
             try:
                 shutil.copy(self.h5_path, h5_path)
+                self.close_h5_file()
                 self.h5_path = h5_path
             except OSError:
                 logging.exception("Error copying existing h5 file %s to %s", self.h5_path, h5_path)
             return
 
         h5_file = h5py.File(h5_path, "w")
+        if chunks is None:
+            chunks = {}
+
+        h5_data = {}
+        for key in ["inputs", "targets"]:
+            if getattr(self, key) is None:
+                continue
+
+            if is_stacked(getattr(self, key)) or not getattr(self, f"pad_{key}"):
+                h5_data[key] = getattr(self, key)
+            else:
+                write_ragged_h5_dataset(
+                    h5_file,
+                    key,
+                    getattr(self, key),
+                    chunks=chunks.get(f"{key}_data"),
+                    compression=compression,
+                    shuffle=shuffle,
+                )
 
         keys = [
-            "inputs",
-            "targets",
             "input_lengths",
             "target_lengths",
             "piece_lengths",
@@ -294,9 +689,21 @@ class HarmonicDataset(Dataset):
         ]
         for key in keys:
             if hasattr(self, key) and getattr(self, key) is not None:
-                h5_file.create_dataset(key, data=np.array(getattr(self, key)), compression="gzip")
+                h5_data[key] = getattr(self, key)
+
+        for key, data in h5_data.items():
+            data = np.array(data)
+            h5_file.create_dataset(
+                key,
+                data=data,
+                compression=compression,
+                shuffle=shuffle,
+                chunks=chunks.get(key, get_default_h5_chunks(key, data.shape)),
+            )
         if file_ids is not None:
-            h5_file.create_dataset("file_ids", data=np.array(file_ids), compression="gzip")
+            h5_file.create_dataset(
+                "file_ids", data=np.array(file_ids), compression=compression, shuffle=shuffle
+            )
         h5_file.close()
 
 
@@ -329,29 +736,19 @@ class ChordTransitionDataset(HarmonicDataset):
             True if the targets will be ignored. False to load targets from the given pieces.
         """
         super().__init__(transform=transform)
-        self.inputs = [
-            np.vstack(
-                [
-                    note.to_vec(dur_from_prev=from_prev, dur_to_next=to_next)
-                    for note, from_prev, to_next in zip(
-                        piece.get_inputs(),
-                        [None] + list(piece.get_duration_cache()),
-                        list(piece.get_duration_cache()),
-                    )
-                ]
-            )
-            for piece in pieces
-        ]
+        self.inputs = [piece.get_note_matrix() for piece in pieces]
 
-        self.targets = [np.zeros(len(piece_input), dtype=int) for piece_input in self.inputs]
+        self.targets = [
+            np.zeros(len(piece_input), dtype=TARGET_DTYPE) for piece_input in self.inputs
+        ]
         if not dummy_targets:
             for piece, target in zip(pieces, self.targets):
                 target[piece.get_chord_change_indices()] = 1
                 target[0] = -100
                 target[np.roll(piece.get_duration_cache() == 0, 1)] = -100
 
-        self.input_lengths = np.array([len(inputs) for inputs in self.inputs])
-        self.target_lengths = np.array([len(target) for target in self.targets])
+        self.input_lengths = np.array([len(inputs) for inputs in self.inputs], dtype=LENGTH_DTYPE)
+        self.target_lengths = np.array([len(target) for target in self.targets], dtype=LENGTH_DTYPE)
 
         self.pad_targets = True
         self.pad_inputs = True
@@ -430,18 +827,25 @@ class ChordClassificationDataset(HarmonicDataset):
                 )
             )
 
-        self.input_lengths = np.array([len(inputs) for inputs in self.inputs])
+        self.input_lengths = np.array([len(inputs) for inputs in self.inputs], dtype=LENGTH_DTYPE)
 
         if dummy_targets:
-            self.targets = np.zeros(len(self.inputs))
+            self.targets = np.zeros(len(self.inputs), dtype=TARGET_DTYPE)
         else:
-            self.targets = np.array(
-                [
-                    chord.get_one_hot_index(relative=False, use_inversion=True, pad=False)
-                    for piece in pieces
-                    for chord in piece.get_chords()
-                ]
-            )
+            chords = [chord for piece in pieces for chord in piece.get_chords()]
+
+            if len(chords) > 0:
+                self.targets = get_chord_one_hot_indexes(
+                    [chord.chord_type for chord in chords],
+                    [chord.root for chord in chords],
+                    chords[0].pitch_type,
+                    inversions=[chord.inversion for chord in chords],
+                    use_inversion=True,
+                    relative=False,
+                    pad=False,
+                ).astype(TARGET_DTYPE)
+            else:
+                self.targets = np.array([], dtype=TARGET_DTYPE)
 
             if len(pieces) > 0 and len(pieces[0].get_chords()) > 0:
                 self.target_pitch_type = [pieces[0].get_chords()[0].pitch_type.value]
@@ -461,6 +865,9 @@ class ChordClassificationDataset(HarmonicDataset):
 
         return super().__getitem__(orig_item, transposition=transposition)
 
+    def get_h5_row(self, item: int) -> int:
+        return item // self.num_transpositions
+
     def generate_intermediate_targets(self, target: int) -> Dict[str, Union[int, List]]:
         """
         For the given target index (already reduced), generate the intermediate targets of:
@@ -672,12 +1079,13 @@ class ChordSequenceDataset(HarmonicDataset):
                     [
                         chord.get_one_hot_index(relative=True, use_inversion=True, pad=False)
                         for chord in chords
-                    ]
+                    ],
+                    dtype=TARGET_DTYPE,
                 )
             )
 
-        self.target_lengths = np.array([len(target) for target in self.targets])
-        self.input_lengths = np.array([len(inputs) for inputs in self.inputs])
+        self.target_lengths = np.array([len(target) for target in self.targets], dtype=LENGTH_DTYPE)
+        self.input_lengths = np.array([len(inputs) for inputs in self.inputs], dtype=LENGTH_DTYPE)
 
         self.input_reduction = input_reduction
         self.output_reduction = output_reduction
@@ -785,10 +1193,16 @@ class KeyHarmonicDataset(HarmonicDataset):
 
     def __len__(self) -> int:
         if not self.in_ram:
-            with h5py.File(self.h5_path, "r") as h5_file:
-                return int(np.sum(h5_file["piece_lengths"]))
+            if self._length is None:
+                self.get_h5_file()
+                self._length = int(np.sum(self._h5_datasets["piece_lengths"]))
+            return self._length
         return int(np.sum(self.piece_lengths))
 
+    def __getitems__(self, items: List[int]) -> List[Dict]:
+        # Inputs are stored per piece but targets per item, so rows are not prefetched
+        return [self[item] for item in items]
+
     def __getitem__(self, item, transposition: int = None) -> Dict:
         def get_piece_index(item: int) -> Tuple[int, bool]:
             """
@@ -823,13 +1237,16 @@ class KeyHarmonicDataset(HarmonicDataset):
         piece_idx, prev_in_piece = get_piece_index(item)
 
         if not self.in_ram:
-            assert self.h5_path is not None, "Data must be either in ram or in an h5_file."
-            with h5py.File(self.h5_path, "r") as h5_file:
-                piece_input = h5_file["inputs"][piece_idx]
-                input_length = h5_file["input_lengths"][item]
-                start_index = h5_file["input_lengths"][item - 1] if prev_in_piece else 0
-                key_change_replacement = h5_file["key_change_replacements"][item]
-                target = h5_file["targets"][item]
+            self.get_h5_file()
+            input_lengths = self._h5_lengths["input_lengths"]
+            if "inputs" in self._h5_offsets:
+                piece_input = self.read_h5_ragged("inputs", piece_idx)
+            else:
+                piece_input = self._h5_datasets["inputs"][piece_idx]
+            input_length = input_lengths[item]
+            start_index = input_lengths[item - 1] if prev_in_piece else 0
+            key_change_replacement = self._h5_datasets["key_change_replacements"][item]
+            target = self._h5_datasets["targets"][item]
 
         else:
             piece_input = self.inputs[piece_idx]
@@ -970,6 +1387,10 @@ class KeyTransitionDataset(KeyHarmonicDataset):
         if len(self.key_change_replacements) > 0:
             self.key_change_replacements = np.vstack(self.key_change_replacements)
 
+        self.targets = np.array(self.targets, dtype=TARGET_DTYPE)
+        self.input_lengths = np.array(self.input_lengths, dtype=LENGTH_DTYPE)
+        self.piece_lengths = np.array(self.piece_lengths, dtype=LENGTH_DTYPE)
+
 
 class KeySequenceDataset(KeyHarmonicDataset):
     """
@@ -1066,6 +1487,10 @@ class KeySequenceDataset(KeyHarmonicDataset):
         if len(self.key_change_replacements) > 0:
             self.key_change_replacements = np.vstack(self.key_change_replacements)
 
+        self.targets = np.array(self.targets, dtype=TARGET_DTYPE)
+        self.input_lengths = np.array(self.input_lengths, dtype=LENGTH_DTYPE)
+        self.piece_lengths = np.array(self.piece_lengths, dtype=LENGTH_DTYPE)
+
 
 def h5_to_dataset(
     h5_path: Union[str, Path],
@@ -1099,9 +1524,11 @@ def h5_to_dataset(
 
     dataset = dataset_class([], transform=transform, **dataset_kwargs)
 
-    with h5py.File(h5_path, "r") as h5_file:
-        assert "inputs" in h5_file, f"{h5_file} must have a dataset called inputs"
-        assert "targets" in h5_file, f"{h5_file} must have a dataset called targets"
+    with h5py.File(h5_path, "r", **H5_CHUNK_CACHE_KWARGS) as h5_file:
+        for key in ["inputs", "targets"]:
+            assert (
+                key in h5_file or f"{key}_offsets" in h5_file
+            ), f"{h5_file} must have a dataset called {key} (or {key}_data and {key}_offsets)"
         dataset.h5_path = h5_path
         dataset.padded = False
         dataset.in_ram = False
@@ -1109,7 +1536,26 @@ def h5_to_dataset(
 
         try:
             for data in ["input", "target"]:
-                if f"{data}_lengths" in h5_file:
+                if f"{data}s_offsets" in h5_file:
+                    offsets = np.array(h5_file[f"{data}s_offsets"])
+                    data_list = []
+
+                    for chunk_start in tqdm(
+                        range(0, len(offsets) - 1, chunk_size),
+                        desc=f"Loading {data} chunks from {h5_path}",
+                    ):
+                        chunk_offsets = offsets[chunk_start : chunk_start + chunk_size + 1]
+                        chunk = np.asarray(
+                            h5_file[f"{data}s_data"][chunk_offsets[0] : chunk_offsets[-1]],
+                            dtype=get_storage_dtype([h5_file[f"{data}s_data"].dtype]),
+                        )
+                        data_list.extend(np.split(chunk, chunk_offsets[1:-1] - chunk_offsets[0]))
+
+                    if f"{data}_lengths" in h5_file:
+                        setattr(dataset, f"{data}_lengths", np.array(h5_file[f"{data}_lengths"]))
+                    setattr(dataset, f"{data}s", data_list)
+
+                elif f"{data}_lengths" in h5_file:
                     lengths = np.array(h5_file[f"{data}_lengths"])
                     data_list = []
 
@@ -1121,7 +1567,7 @@ def h5_to_dataset(
                         chunk_lengths = lengths[chunk_start : chunk_start + chunk_size]
                         data_list.extend(
                             [
-                                np.array(item[:length], dtype=np.float16)
+                                np.array(item[:length], dtype=get_storage_dtype([chunk.dtype]))
                                 for item, length in zip(chunk, chunk_lengths)
                             ]
                         )
@@ -1130,7 +1576,14 @@ def h5_to_dataset(
                     setattr(dataset, f"{data}s", data_list)
 
                 else:
-                    setattr(dataset, f"{data}s", np.array(h5_file[f"{data}s"], dtype=np.float16))
+                    setattr(
+                        dataset,
+                        f"{data}s",
+                        np.asarray(
+                            h5_file[f"{data}s"],
+                            dtype=get_storage_dtype([h5_file[f"{data}s"].dtype]),
+                        ),
+                    )
 
             for key in ["piece_lengths", "key_change_replacements", "target_pitch_type"]:
                 if key in h5_file:
@@ -1145,11 +1598,158 @@ def h5_to_dataset(
     return dataset
 
 
+def get_default_h5_chunks(key: str, shape: Tuple[int, ...]) -> Union[Tuple[int, ...], bool]:
+    """
+    Get the default chunk shape to use when writing the given h5 dataset.
+
+    The padded inputs and targets are read one row per __getitem__ call, so they are chunked
+    by row (so that each read decompresses exactly one chunk). 1-dimensional arrays
+    (e.g., lengths) are read in bulk, so they are written in large chunks. Ragged data
+    (e.g., "inputs_data") is read as contiguous runs of rows, so it is also written in large
+    chunks of rows.
+
+    Parameters
+    ----------
+    key : str
+        The name of the h5 dataset to be written.
+    shape : Tuple[int, ...]
+        The shape of the data to be written.
+
+    Returns
+    -------
+    chunks : Union[Tuple[int, ...], bool]
+        The chunk shape to use for the h5 dataset, or True to let h5py choose one.
+    """
+    if len(shape) == 0 or 0 in shape:
+        return True
+
+    if len(shape) == 1 or key.endswith("_data"):
+        return (min(shape[0], 4096),) + tuple(shape[1:])
+
+    if key in ["inputs", "targets"]:
+        return (1,) + tuple(shape[1:])
+
+    return True
+
+
+def is_stacked(array: Union[List[np.array], np.array]) -> bool:
+    """
+    Check whether the given data is already stacked into a single numeric nd-array (and
+    therefore does not need to be padded).
+
+    Parameters
+    ----------
+    array : Union[List[np.array], np.array]
+        A list of numpy ndarrays, or an nd-array.
+
+    Returns
+    -------
+    stacked : bool
+        True if the given array is a numpy nd-array with a non-object dtype. False otherwise.
+    """
+    return isinstance(array, np.ndarray) and array.dtype != object
+
+
+def get_storage_dtype(array: List[Union[np.array, np.dtype]]) -> np.dtype:
+    """
+    Get the dtype with which to store the given list of arrays once padded or concatenated.
+    Integer (and boolean) data keeps its dtype. Floating point data is stored as np.float16.
+
+    Parameters
+    ----------
+    array : List[Union[np.array, np.dtype]]
+        A list of numpy ndarrays (or of their dtypes).
+
+    Returns
+    -------
+    dtype : np.dtype
+        The dtype to use to store the given arrays.
+    """
+    dtype = np.result_type(*array)
+    if not (np.issubdtype(dtype, np.integer) or np.issubdtype(dtype, np.bool_)):
+        dtype = np.float16
+    return np.dtype(dtype)
+
+
+def write_ragged_h5_dataset(
+    h5_file: h5py.File,
+    key: str,
+    array: List[np.array],
+    chunks: Union[Tuple[int, ...], bool] = None,
+    compression: str = "lzf",
+    shuffle: bool = True,
+):
+    """
+    Write the given list, whose elements must only match in dimensions past the first, into
+    the given h5 file without any padding, as the datasets f"{key}_data" (the arrays
+    concatenated along their first dimension) and f"{key}_offsets" (an array of length
+    len(array) + 1, where the original array[i] is f"{key}_data"[offsets[i]:offsets[i + 1]]).
+
+    The data is streamed into a pre-allocated h5 dataset, roughly one chunk at a time, so
+    the full concatenated array is never built in memory.
+
+    Parameters
+    ----------
+    h5_file : h5py.File
+        The h5 file to write into. It must be open for writing.
+    key : str
+        The base name of the h5 datasets to write.
+    array : List[np.array]
+        A list of numpy ndarrays. The shape of each ndarray must match in every dimension except
+        the first. The data is stored with dtype get_storage_dtype(array).
+    chunks : Union[Tuple[int, ...], bool]
+        The chunk shape to use for f"{key}_data". Defaults to get_default_h5_chunks(...).
+    compression : str
+        The h5py compression filter to use for both datasets.
+    shuffle : bool
+        True to apply the h5 byte-shuffle filter before compression.
+    """
+    offsets = np.zeros(len(array) + 1, dtype=int)
+    np.cumsum([len(item) for item in array], out=offsets[1:])
+
+    data_key = f"{key}_data"
+    shape = (offsets[-1],) + tuple(array[0].shape[1:])
+    if chunks is None:
+        chunks = get_default_h5_chunks(data_key, shape)
+
+    dataset = h5_file.create_dataset(
+        data_key,
+        shape=shape,
+        dtype=get_storage_dtype([item.dtype for item in array]),
+        chunks=chunks,
+        compression=compression,
+        shuffle=shuffle,
+    )
+
+    # Buffer items until they fill (at least) one chunk, so that each chunk is only
+    # compressed and written once
+    rows_per_write = dataset.chunks[0] if dataset.chunks else 1
+    buffer = []
+    buffer_start = 0
+    for item, end in zip(array, offsets[1:]):
+        buffer.append(item)
+        if end - buffer_start >= rows_per_write or end == offsets[-1]:
+            block = buffer[0] if len(buffer) == 1 else np.concatenate(buffer)
+            dataset[buffer_start:end] = block.astype(dataset.dtype, copy=False)
+            buffer = []
+            buffer_start = end
+
+    h5_file.create_dataset(
+        f"{key}_offsets",
+        data=offsets,
+        compression=compression,
+        shuffle=shuffle,
+        chunks=get_default_h5_chunks(f"{key}_offsets", offsets.shape),
+    )
+
+
 def pad_array(array: List[np.array]) -> Tuple[np.array, np.array]:
     """
     Pad the given list, whose elements must only match in dimensions past the first, into a
     numpy nd-array of equal dimensions.
 
+    Integer (and boolean) data keeps its dtype. Floating point data is stored as np.float16.
+
     Parameters
     ----------
     array : List[np.array]
@@ -1165,25 +1765,79 @@ def pad_array(array: List[np.array]) -> Tuple[np.array, np.array]:
         The size of the first dimension of each nested numpy nd-array before padding. Using this,
         the original array[i] can be gotten with padded_array[i, :array_lengths[i]].
     """
-    array_lengths = np.array([len(item) for item in array])
+    array_lengths = np.array([len(item) for item in array], dtype=LENGTH_DTYPE)
 
     full_array_size = [len(array), max(array_lengths)]
     if len(array[0].shape) > 1:
         full_array_size += list(array[0].shape)[1:]
     full_array_size = tuple(full_array_size)
 
-    padded_array = np.zeros(full_array_size, dtype=np.float16)
-    for index, item in enumerate(array):
-        padded_array[index, : len(item)] = item
+    dtype = get_storage_dtype(array)
+
+    # The data region is fully overwritten, so only the padding needs to be zeroed
+    padded_array = np.empty(full_array_size, dtype=dtype)
+
+    if np.prod(full_array_size[1:]) >= PAD_ROW_COPY_MIN_SIZE:
+        # Large items (e.g., note matrices): one contiguous block copy per item
+        for item, padded_item, length in zip(array, padded_array, array_lengths):
+            padded_item[:length] = item
+            padded_item[length:] = 0
+
+    else:
+        # Many small items: copy every item into place with a single write of the concatenated
+        # items. The mask is True at [i, j] for every j < array_lengths[i], which (in row-major
+        # order) matches the order of the values in the concatenated array.
+        mask = np.arange(full_array_size[1]) < array_lengths[:, None]
+        padded_array[mask] = np.concatenate(array, axis=0)
+        padded_array[~mask] = 0
 
     return padded_array, array_lengths
 
 
+def get_score_piece_or_none(
+    file_id: int,
+    file_name: str,
+    notes_df: pd.DataFrame,
+    chords_df: pd.DataFrame,
+    measures_df: pd.DataFrame,
+) -> Union[Piece, None]:
+    """
+    Create a ScorePiece from the given DataFrames of a single piece, logging (rather than
+    raising) any error.
+
+    Parameters
+    ----------
+    file_id : int
+        The file_id of the piece, used for logging.
+    file_name : str
+        The name of the piece, used for logging.
+    notes_df : pd.DataFrame
+        The notes of the piece.
+    chords_df : pd.DataFrame
+        The chords of the piece.
+    measures_df : pd.DataFrame
+        The measures of the piece.
+
+    Returns
+    -------
+    piece : Union[Piece, None]
+        The parsed piece, or None if an error occurred.
+    """
+    logging.info("Parsing %s (id %s)", file_name, file_id)
+
+    try:
+        return get_score_piece_from_data_frames(notes_df, chords_df, measures_df)
+    except Exception:
+        logging.exception("Error parsing index %s", file_id)
+        return None
+
+
 def get_split_file_ids_and_pieces(
     data_dfs: Dict[str, pd.DataFrame] = None,
     xml_and_csv_paths: Dict[str, List[Union[str, Path]]] = None,
     splits: Iterable[float] = (0.8, 0.1, 0.1),
     seed: int = None,
+    num_workers: int = 1,
 ) -> Tuple[Iterable[Iterable[int]], Iterable[Piece]]:
     """
     Get the file_ids that should go in each split of a split dataset.
@@ -1200,6 +1854,9 @@ def get_split_file_ids_and_pieces(
         This will be normalized to sum to 1.
     seed : int
         A numpy random seed, if given.
+    num_workers : int
+        The number of processes to use to parse pieces from data_dfs in parallel.
+        1 parses all pieces in the current process.
 
     Returns
     -------
@@ -1219,15 +1876,25 @@ def get_split_file_ids_and_pieces(
     pieces = []
 
     if data_dfs is not None:
-        for i in tqdm(data_dfs["files"].index):
+        file_ids = []
+        file_names = []
+        piece_dfs = {"notes": [], "chords": [], "measures": []}
+
+        names = ["chords", "measures", "notes"]
+        dfs_by_id = {
+            name: {
+                file_id: df.droplevel(0)
+                for file_id, df in data_dfs[name].groupby(level=0, sort=False)
+            }
+            for name in names
+        }
+
+        for i in data_dfs["files"].index:
             file_name = (
                 f"{data_dfs['files'].loc[i].corpus_name}/{data_dfs['files'].loc[i].file_name}"
             )
-            logging.info("Parsing %s (id %s)", file_name, i)
 
-            dfs = [data_dfs["chords"], data_dfs["measures"], data_dfs["notes"]]
-            names = ["chords", "measures", "notes"]
-            exists = [i in df.index.get_level_values(0) for df in dfs]
+            exists = [i in dfs_by_id[name] for name in names]
 
             if not all(exists):
                 for exist, name in zip(exists, names):
@@ -1237,15 +1904,38 @@ def get_split_file_ids_and_pieces(
                         )
                 continue
 
-            try:
-                piece = get_score_piece_from_data_frames(
-                    data_dfs["notes"].loc[i], data_dfs["chords"].loc[i], data_dfs["measures"].loc[i]
+            file_ids.append(i)
+            file_names.append(file_name)
+            for name, df_list in piece_dfs.items():
+                df_list.append(dfs_by_id[name][i])
+
+        parse_args = (
+            file_ids,
+            file_names,
+            piece_dfs["notes"],
+            piece_dfs["chords"],
+            piece_dfs["measures"],
+        )
+
+        if num_workers > 1:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                parsed_pieces = list(
+                    tqdm(
+                        executor.map(get_score_piece_or_none, *parse_args),
+                        desc="Parsing pieces",
+                        total=len(file_ids),
+                    )
                 )
+        else:
+            parsed_pieces = [
+                get_score_piece_or_none(*args)
+                for args in tqdm(zip(*parse_args), desc="Parsing pieces", total=len(file_ids))
+            ]
+
+        for i, piece in zip(file_ids, parsed_pieces):
+            if piece is not None:
                 pieces.append(piece)
                 indexes.append(i)
-            except Exception:
-                logging.exception("Error parsing index %s", i)
-                continue
 
     elif xml_and_csv_paths is not None:
         for i, (xml_path, csv_path) in tqdm(
@@ -1260,8 +1950,8 @@ def get_split_file_ids_and_pieces(
     # Shuffle the pieces and the df_indexes the same way
     shuffled_indexes = np.arange(len(indexes))
     np.random.shuffle(shuffled_indexes)
-    pieces = np.array(pieces)[shuffled_indexes]
-    indexes = np.array(indexes)[shuffled_indexes]
+    pieces = [pieces[i] for i in shuffled_indexes]
+    indexes = [indexes[i] for i in shuffled_indexes]
 
     split_pieces = []
     split_indexes = []
@@ -1270,17 +1960,9 @@ def get_split_file_ids_and_pieces(
         start = int(round(prop * len(pieces)))
         prop += split_prop
         end = int(round(prop * len(pieces)))
-        length = end - start
-
-        if length == 0:
-            split_pieces.append([])
-            split_indexes.append([])
-        elif length == 1:
-            split_pieces.append([pieces[start]])
-            split_indexes.append([indexes[start]])
-        else:
-            split_pieces.append(pieces[start:end])
-            split_indexes.append(indexes[start:end])
+
+        split_pieces.append(pieces[start:end])
+        split_indexes.append(indexes[start:end])
 
     return split_indexes, split_pieces
 
@@ -1291,6 +1973,7 @@ def get_dataset_splits(
     xml_and_csv_paths: Dict[str, List[Union[str, Path]]] = None,
     splits: Iterable[float] = (0.8, 0.1, 0.1),
     seed: int = None,
+    num_workers: int = 1,
 ) -> Tuple[List[List[HarmonicDataset]], List[List[int]], List[List[Piece]]]:
     """
     Get datasets representing splits of the data in the given DataFrames.
@@ -1311,6 +1994,9 @@ def get_dataset_splits(
         This will be normalized to sum to 1.
     seed : int
         A numpy random seed, if given.
+    num_workers : int
+        The number of processes to use to parse pieces from data_dfs in parallel.
+        1 parses all pieces in the current process.
 
     Returns
     -------
@@ -1327,9 +2013,10 @@ def get_dataset_splits(
         xml_and_csv_paths=xml_and_csv_paths,
         splits=splits,
         seed=seed,
+        num_workers=num_workers,
     )
 
-    dataset_splits = np.full((len(datasets), len(splits)), None)
+    dataset_splits = [[None] * len(splits) for _ in range(len(datasets))]
     for split_index, (split_prop, pieces) in enumerate(zip(splits, split_pieces)):
         if len(pieces) == 0:
             logging.warning(
@@ -1,7 +1,7 @@
 """An object to represent Key information for music."""
 import inspect
 import logging
-from typing import Dict
+from typing import Dict, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -228,6 +228,27 @@ class Key:
         """
         return self.equals(other, use_relative=use_relative)
 
+    def repetition_key(self, use_relative: bool = True) -> Tuple[int, int, int]:
+        """
+        Get a tuple of the attributes checked by is_repeated(...), such that (for two Keys)
+        key.is_repeated(other, **kwargs) if and only if
+        key.repetition_key(**kwargs) == other.repetition_key(**kwargs).
+
+        Parameters
+        ----------
+        use_relative : bool
+            True to take use relative_tonic and relative_mode.
+            False to use local_tonic and local_mode.
+
+        Returns
+        -------
+        repetition_key : Tuple[int, int, int]
+            The tonic_type, tonic, and mode of this key, as ints.
+        """
+        if use_relative:
+            return (self.tonic_type.value, self.relative_tonic, self.relative_mode.value)
+        return (self.tonic_type.value, self.local_tonic, self.local_mode.value)
+
     def equals(self, other: "Key", use_relative: bool = True) -> bool:
         """
         Check if the tonic and mode of this Key are the same.
@@ -287,14 +308,15 @@ class Key:
         return f"{get_pitch_string(self.relative_tonic, self.tonic_type)} {self.relative_mode}"
 
     @staticmethod
-    def from_series(chord_row: pd.Series, tonic_type: PitchType) -> "Key":
+    def from_series(chord_row: Union[pd.Series, Dict], tonic_type: PitchType) -> "Key":
         """
         Create a Key object of the given pitch_type from the given pd.Series.
 
         Parameters
         ----------
-        chord_row : pd.Series
-            The chord row from which to make our Key object. It must contain at least the rows:
+        chord_row : Union[pd.Series, Dict]
+            The chord row from which to make our Key object (a pd.Series or a dict of one).
+            It must contain at least the rows:
                 'globalkey' (str): The global key A-G (major) or a-g (minor) with appended # and b.
                 'globalkey_is_minor' (bool): True if the global key is minor. False if major.
                 'localkey' (str): A Roman numeral representing the local key relative to the global
@@ -2,7 +2,7 @@
 import inspect
 import logging
 from fractions import Fraction
-from typing import Dict, Tuple, Union
+from typing import Dict, List, Tuple, Union
 
 import music21
 import numpy as np
@@ -13,10 +13,21 @@ from harmonic_inference.data.data_types import PitchType
 from harmonic_inference.utils.harmonic_constants import NUM_PITCHES, TPC_C
 from harmonic_inference.utils.harmonic_utils import get_pitch_from_string, get_pitch_string
 from harmonic_inference.utils.rhythmic_utils import (
+    get_measure,
     get_metrical_level,
     get_rhythmic_info_as_proportion_of_range,
 )
 
+NOTE_ARRAY_DTYPE = np.dtype(
+    [
+        ("pitch_class", np.int16),
+        ("octave", np.int16),
+        ("midi_note_number", np.int16),
+        ("onset_level", np.int8),
+        ("offset_level", np.int8),
+    ]
+)
+
 
 class Note:
     """
@@ -137,7 +148,7 @@ class Note:
         chord_onset: Union[float, Tuple[int, Fraction]] = None,
         chord_offset: Union[float, Tuple[int, Fraction]] = None,
         chord_duration: Union[float, Fraction] = None,
-        measures_df: pd.DataFrame = None,
+        measures_df: Union[pd.DataFrame, Dict[int, Dict]] = None,
         min_pitch: Tuple[int, int] = None,
         max_pitch: Tuple[int, int] = None,
         note_onset: Fraction = None,
@@ -164,7 +175,7 @@ class Note:
             relative positions or durations). None to not include chord-relative information in the
             vector.
 
-        measures_df : pd.DataFrame
+        measures_df : Union[pd.DataFrame, Dict[int, Dict]]
             The measures DataFrame for this piece, to be used for getting metrical range
             information. None to not include chord-relative metrical information in the
             vector.
@@ -176,6 +187,7 @@ class Note:
                                     Should be 0 except for incomplete pick-up measures.
                 'next' (int): The mc of the measure that follows each measure
                               (or None for the last measure).
+            A Dict from rhythmic_utils.get_measures_dict(...) is also accepted.
 
         min_pitch : Tuple[int, int]
             The minimum pitch of any note in this set of notes, expressed as an (octave,
@@ -333,8 +345,8 @@ class Note:
 
     @staticmethod
     def from_series(
-        note_row: pd.Series,
-        measures_df: pd.DataFrame,
+        note_row: Union[pd.Series, Dict],
+        measures_df: Union[pd.DataFrame, Dict[int, Dict]],
         pitch_type: PitchType,
         levels_cache: Dict[str, Dict[Fraction, int]] = None,
     ) -> "Note":
@@ -343,8 +355,9 @@ class Note:
 
         Parameters
         ----------
-        note_row : pd.Series
-            A pd.Series of a note. Must have at least the fields:
+        note_row : Union[pd.Series, Dict]
+            A pd.Series of a note (or a dict of one, e.g., from DataFrame.to_dict("records")).
+            Must have at least the fields:
                 'midi' (int): MIDI pitch, from 0 to 127.
                 'tpc' (int): The note's TPC pitch, where C = 0. Required if pitch_type is TPC.
                 'mc' (int): The note's onset measure.
@@ -352,11 +365,12 @@ class Note:
                 'offset_mc' (int): The note's offset measure.
                 'offset_beat' (Fraction): The note's offset beat, in whole notes.
                 'duration' (Fraction): The note's duration, in whole notes.
-        measures_df : pd.DataFrame
+        measures_df : Union[pd.DataFrame, Dict[int, Dict]]
             A pd.DataFrame of the measures in the piece of the note. It is used to get metrical
             levels of the note's onset and offset. Must have at least the columns:
                 'mc' (int): The measure number, to match with the note's onset and offset.
                 'timesig' (str): The time signature of the measure.
+            A Dict from rhythmic_utils.get_measures_dict(...) is also accepted.
         pitch_type : PitchType
             The pitch type to use for the Note.
         levels_cache : Dict[str, Dict[Fraction, int]]
@@ -389,7 +403,7 @@ class Note:
                     [note_row[NOTE_ONSET_BEAT], note_row["offset_beat"]],
                 )
             ):
-                measure = measures_df.loc[measures_df["mc"] == mc].squeeze()
+                measure = get_measure(measures_df, mc)
 
                 if levels_cache is None:
                     level = get_metrical_level(beat, measure)
@@ -427,7 +441,7 @@ class Note:
     @staticmethod
     def from_music21(
         m21_note: music21.note.Note,
-        measures_df: pd.DataFrame,
+        measures_df: Union[pd.DataFrame, Dict[int, Dict]],
         mc: int,
         pitch_type: PitchType,
         m21_chord: music21.chord.Chord = None,
@@ -440,13 +454,14 @@ class Note:
         ----------
         m21_note : music21.note.Note
             A music21 Note object to turn into our Note.
-        measures_df : pd.DataFrame
+        measures_df : Union[pd.DataFrame, Dict[int, Dict]]
             A pd.DataFrame of the measures in the piece of the note. It is used to get metrical
             levels of the note's onset and offset. Must have at least the columns:
                 'mc' (int): The measure number, to match with the note's onset and offset.
                 'timesig' (str): The time signature of each measure.
                 'start' (Fraction): The position at the start of each measure, in whole notes
                                     since the beginning of the piece.
+            A Dict from rhythmic_utils.get_measures_dict(...) is also accepted.
         mc : int
             The mc of the measure containing the note's onset.
         pitch_type : PitchType
@@ -469,14 +484,14 @@ class Note:
         note_start = Fraction(m21_rhythmic.offset) / 4
         note_duration = Fraction(m21_rhythmic.quarterLength) / 4
 
-        onset_measure = measures_df.loc[measures_df["mc"] == mc].iloc[0]
+        onset_measure = get_measure(measures_df, mc)
 
         # Find the offset measure
         offset_measure = onset_measure
         tmp_duration = note_duration + note_start - onset_measure[MEASURE_OFFSET]
         while tmp_duration >= offset_measure["act_dur"] and not pd.isna(offset_measure["next"]):
             tmp_duration -= offset_measure["act_dur"]
-            offset_measure = measures_df.loc[measures_df["mc"] == offset_measure["next"]].iloc[0]
+            offset_measure = get_measure(measures_df, offset_measure["next"])
 
         onset_beat = note_start
         offset_beat = tmp_duration + offset_measure[MEASURE_OFFSET]
@@ -550,3 +565,218 @@ def get_note_vector_length(pitch_type: PitchType) -> int:
         + num_octaves  # Relative octave (above lowest note in chord window)
         + extra
     )
+
+
+def get_note_array(notes: List[Note]) -> np.ndarray:
+    """
+    Get a structured array (with dtype NOTE_ARRAY_DTYPE) of the integer-valued fields of
+    the given notes, so that they can be accessed as whole columns rather than note by note.
+
+    Parameters
+    ----------
+    notes : List[Note]
+        The notes to store. They must all have the same pitch_type.
+
+    Returns
+    -------
+    note_array : np.ndarray
+        A structured array with one row per note, and the columns "pitch_class", "octave",
+        "midi_note_number", "onset_level", and "offset_level".
+    """
+    note_array = np.zeros(len(notes), dtype=NOTE_ARRAY_DTYPE)
+    if len(notes) == 0:
+        return note_array
+
+    pitch_classes = np.array([note.pitch_class for note in notes], dtype=int)
+    octaves = np.array([note.octave for note in notes], dtype=int)
+
+    pitch_type = notes[0].pitch_type
+    if pitch_type == PitchType.MIDI:
+        midi_note_numbers = NUM_PITCHES[PitchType.TPC] * octaves + pitch_classes
+    else:
+        midi_pitch_classes = np.array(
+            [
+                get_pitch_from_string(get_pitch_string(pitch, pitch_type), PitchType.MIDI)
+                for pitch in range(NUM_PITCHES[pitch_type])
+            ]
+        )
+        midi_note_numbers = (
+            NUM_PITCHES[PitchType.MIDI] * octaves + midi_pitch_classes[pitch_classes]
+        )
+
+    note_array["pitch_class"] = pitch_classes
+    note_array["octave"] = octaves
+    note_array["midi_note_number"] = midi_note_numbers
+    note_array["onset_level"] = [note.onset_level for note in notes]
+    note_array["offset_level"] = [note.offset_level for note in notes]
+
+    return note_array
+
+
+def get_note_vectors(
+    notes: List[Note],
+    dur_from_prev: List[Union[float, Fraction]] = None,
+    dur_to_next: List[Union[float, Fraction]] = None,
+    chord_onset: Union[float, Tuple[int, Fraction]] = None,
+    chord_offset: Union[float, Tuple[int, Fraction]] = None,
+    chord_duration: Union[float, Fraction] = None,
+    measures_df: Union[pd.DataFrame, Dict[int, Dict]] = None,
+    min_pitch: Tuple[int, int] = None,
+    max_pitch: Tuple[int, int] = None,
+    note_onsets: List[Fraction] = None,
+    note_array: np.ndarray = None,
+) -> np.array:
+    """
+    Get the vectors of many notes at once. This is equivalent to (but much faster than)
+    stacking note.to_vec(...) for each note, with the same chord-relative arguments for
+    every note and each note's own note_onset, dur_from_prev, and dur_to_next.
+
+    Parameters
+    ----------
+    notes : List[Note]
+        The notes to vectorize. They must all have the same pitch_type.
+    dur_from_prev : List[Union[float, Fraction]]
+        The duration from each note's onset from the previous note's onset. None values
+        (or None for the whole list) are treated as 0.
+    dur_to_next : List[Union[float, Fraction]]
+        The duration from each note's onset to the next note's onset. None values
+        (or None for the whole list) are treated as 0.
+    chord_onset : Union[float, Tuple[int, Fraction]]
+        The onset position of the chord the vectors should be relative to. See Note.to_vec.
+    chord_offset : Union[float, Tuple[int, Fraction]]
+        The offset position of the chord the vectors should be relative to. See Note.to_vec.
+    chord_duration : Union[float, Fraction]
+        The duration of the chord the vectors should be relative to. See Note.to_vec.
+    measures_df : Union[pd.DataFrame, Dict[int, Dict]]
+        The measures of the piece, used for chord-relative metrical information.
+        See Note.to_vec.
+    min_pitch : Tuple[int, int]
+        The minimum pitch of any note in this set of notes, as an (octave, MIDI note number)
+        tuple. See Note.to_vec.
+    max_pitch : Tuple[int, int]
+        The maximum pitch of any note in this set of notes, as an (octave, MIDI note number)
+        tuple. See Note.to_vec.
+    note_onsets : List[Fraction]
+        The duration from the chord onset to each note's onset. If this (or any of its values)
+        is None, the chord-relative onsets are computed from the measures instead.
+    note_array : np.ndarray
+        The rows of get_note_array(...) for the given notes, if already computed.
+
+    Returns
+    -------
+    vectors : np.array
+        A (num_notes, note_vector_length) array containing the vector of each note.
+
+    Raises
+    ------
+    IndexError
+        If any note's octave, or its octave relative to min_pitch, does not fit in the octave
+        one-hot vectors (e.g. MIDI notes 120-127). Note.to_vec raises an IndexError here too.
+    """
+    pitch_type = notes[0].pitch_type
+    num_pitches = NUM_PITCHES[pitch_type]
+    num_octaves = 127 // NUM_PITCHES[PitchType.MIDI]
+
+    if note_array is None:
+        note_array = get_note_array(notes)
+
+    note_indexes = np.arange(len(notes))
+    pitch_classes = note_array["pitch_class"].astype(int)
+    octaves = note_array["octave"].astype(int)
+    onset_levels = note_array["onset_level"].astype(int)
+    offset_levels = note_array["offset_level"].astype(int)
+    midi_note_numbers = note_array["midi_note_number"].astype(int)
+
+    # Out of range octaves would otherwise be written silently into neighbouring features.
+    # Negative relative octaves wrap around, like the negative index in Note.to_vec.
+    lowest_octave = 0 if min_pitch is None else min_pitch[0]
+    relative_octaves = octaves - lowest_octave
+    if (
+        np.any(octaves >= num_octaves)
+        or np.any(relative_octaves >= num_octaves)
+        or np.any(relative_octaves < -num_octaves)
+    ):
+        raise IndexError(
+            f"Note octaves {octaves} (relative to {lowest_octave}) do not fit in the "
+            f"{num_octaves} octave one-hots."
+        )
+
+    vectors = np.zeros((len(notes), get_note_vector_length(pitch_type)), dtype=np.float16)
+
+    # Pitch, octave, onset and offset levels as one-hots
+    vectors[note_indexes, pitch_classes] = 1
+    index = num_pitches
+    vectors[note_indexes, index + octaves] = 1
+    index += num_octaves
+    vectors[note_indexes, index + onset_levels] = 1
+    index += 4
+    vectors[note_indexes, index + offset_levels] = 1
+    index += 4
+
+    # onset, offset, duration as floats, as proportion of chord's range
+    if (
+        chord_onset is not None
+        and chord_offset is not None
+        and chord_duration is not None
+        and measures_df is not None
+    ):
+        if note_onsets is None:
+            note_onsets = [None] * len(notes)
+
+        metrical = []
+        for note, note_onset in zip(notes, note_onsets):
+            if note_onset is None:
+                metrical.append(
+                    get_rhythmic_info_as_proportion_of_range(
+                        pd.Series(
+                            {
+                                "mc": note.onset[0],
+                                NOTE_ONSET_BEAT: note.onset[1],
+                                "duration": note.duration,
+                            }
+                        ),
+                        chord_onset,
+                        chord_offset,
+                        measures_df,
+                        range_len=chord_duration,
+                    )
+                )
+                continue
+
+            try:
+                onset = note_onset / chord_duration
+                duration = note.duration / chord_duration
+                metrical.append((onset, onset + duration, duration))
+            except Exception:
+                # Bugfix for chord duration 0, due to an error in the TSVs
+                metrical.append((Fraction(1), Fraction(1), Fraction(1)))
+        vectors[:, index : index + 3] = np.array(metrical, dtype=np.float16)
+    index += 3
+
+    # Duration to surrounding notes
+    for durations in [dur_from_prev, dur_to_next]:
+        if durations is not None:
+            vectors[:, index] = [0 if duration is None else duration for duration in durations]
+        index += 1
+
+    # Binary -- is this the lowest note in this set of notes
+    if min_pitch is not None:
+        vectors[:, index] = midi_note_numbers == min_pitch[1]
+    index += 1
+
+    # Octave related to surrounding notes as one-hot
+    vectors[note_indexes, index + relative_octaves % num_octaves] = 1
+    index += num_octaves
+
+    # Normalized pitch height
+    vectors[:, index] = midi_note_numbers / 127
+    index += 1
+
+    # Relative to surrounding notes
+    if min_pitch is not None and max_pitch is not None:
+        # If min pitch equals max pitch, we set the range to 1 and every note will have
+        # norm_relative = 0 (as if they were all the bass note).
+        range_size = max(max_pitch[1] - min_pitch[1], 1)
+        vectors[:, index] = (midi_note_numbers - min_pitch[1]) / range_size
+
+    return vectors
@@ -1,9 +1,13 @@
 """A class storing a musical piece from score, midi, or audio format."""
 import bisect
+import operator
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from fractions import Fraction
+from itertools import accumulate
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Iterable, List, Tuple, Union
 
 import music21
 import numpy as np
@@ -14,9 +18,15 @@ from tqdm import tqdm
 import harmonic_inference.utils.rhythmic_utils as ru
 from harmonic_inference.data.chord import Chord
 from harmonic_inference.data.corpus_constants import MEASURE_OFFSET
-from harmonic_inference.data.data_types import NO_REDUCTION, ChordType, PieceType, PitchType
+from harmonic_inference.data.data_types import (
+    NO_REDUCTION,
+    ChordType,
+    KeyMode,
+    PieceType,
+    PitchType,
+)
 from harmonic_inference.data.key import Key
-from harmonic_inference.data.note import Note
+from harmonic_inference.data.note import Note, get_note_array, get_note_vectors
 
 
 def get_reduction_mask(inputs: List[Union[Chord, Key]], kwargs: Dict = None) -> List[bool]:
@@ -29,7 +39,8 @@ def get_reduction_mask(inputs: List[Union[Chord, Key]], kwargs: Dict = None) ->
     inputs : List[Union[Chord, Key]]
         A List of either Chord or Key objects.
     kwargs : Dict
-        A Dictionary of kwargs to pass along to each given input's is_repeated() function.
+        A Dictionary of kwargs to pass along to each given input's is_repeated() function
+        (or, equivalently, repetition_key() function, which is used when available).
 
     Returns
     -------
@@ -41,17 +52,34 @@ def get_reduction_mask(inputs: List[Union[Chord, Key]], kwargs: Dict = None) ->
         kwargs = {}
 
     mask = np.full(len(inputs), True, dtype=bool)
+    if len(inputs) < 2:
+        return mask
 
-    for prev_index, (prev_obj, next_obj) in enumerate(zip(inputs[:-1], inputs[1:])):
-        if next_obj.is_repeated(prev_obj, **kwargs):
-            mask[prev_index + 1] = False
+    input_type = type(inputs[0])
+    if not hasattr(input_type, "repetition_key") or any(
+        type(obj) is not input_type for obj in inputs
+    ):
+        for prev_index, (prev_obj, next_obj) in enumerate(zip(inputs[:-1], inputs[1:])):
+            if next_obj.is_repeated(prev_obj, **kwargs):
+                mask[prev_index + 1] = False
+
+        return mask
+
+    keys = [obj.repetition_key(**kwargs) for obj in inputs]
+    try:
+        keys = np.array(keys, dtype=np.int64)
+    except (TypeError, ValueError):
+        # Some keys contain non-integer values (e.g., suspension strings)
+        mask[1:] = [prev_key != next_key for prev_key, next_key in zip(keys[:-1], keys[1:])]
+        return mask
 
+    mask[1:] = np.any(keys[1:] != keys[:-1], axis=1)
     return mask
 
 
 def get_chord_note_input(
     notes: List[Note],
-    measures_df: pd.DataFrame,
+    measures_df: Union[pd.DataFrame, Dict[int, Dict]],
     chord_onset: Union[float, Tuple[int, Fraction]],
     chord_offset: Union[float, Tuple[int, Fraction]],
     chord_duration: Union[float, Fraction],
@@ -61,6 +89,9 @@ def get_chord_note_input(
     window: int,
     duration_cache: np.array = None,
     chord: Chord = None,
+    onset_ticks: np.array = None,
+    ticks_per_whole_note: int = None,
+    note_array: np.ndarray = None,
 ) -> np.array:
     """
     Get an np.array or input vectors relative to a given chord.
@@ -69,8 +100,9 @@ def get_chord_note_input(
     ----------
     notes : List[Note]
         A List of all of the Notes in the Piece.
-    measures_df : pd.DataFrame
-        The measures_df for this particular Piece.
+    measures_df : Union[pd.DataFrame, Dict[int, Dict]]
+        The measures_df for this particular Piece, or its snapshot from
+        rhythmic_utils.get_measures_dict(...).
     chord_onset : Union[float, Tuple[int, Fraction]]
         The onset location of the chord.
     chord_offset : Union[float, Tuple[int, Fraction]]
@@ -91,6 +123,15 @@ def get_chord_note_input(
         generated by get_duration_cache(...).
     chord : Chord
         The chord the notes belong to, if not None.
+    onset_ticks : np.array
+        The onset position of each note, in ticks, as cached by get_duration_cache(...).
+        If given (with ticks_per_whole_note), this is used to get each note's onset relative
+        to the chord with a single subtraction, rather than by summing the duration_cache.
+    ticks_per_whole_note : int
+        The number of ticks per whole note used in onset_ticks.
+    note_array : np.ndarray
+        The structured array of all of the given notes, from note.get_note_array(...).
+        If given, the notes' pitches and metrical levels are read from it.
 
     Returns
     -------
@@ -105,22 +146,36 @@ def get_chord_note_input(
     window_onset_index = onset_index - window
     window_offset_index = offset_index + window
 
-    # Shift duration_cache
-    dur_from_prevs = [None] + list(duration_cache)
-    dur_to_nexts = list(duration_cache)
-
     # Get the notes within the window
     first_note_index = max(window_onset_index, 0)
     last_note_index = min(window_offset_index, len(notes))
     chord_notes = notes[first_note_index:last_note_index]
 
+    # Durations to and from the surrounding notes (the first note has no previous note)
+    dur_to_nexts = duration_cache[first_note_index:last_note_index]
+    if first_note_index > 0:
+        dur_from_prevs = duration_cache[first_note_index - 1 : last_note_index - 1]
+    else:
+        dur_from_prevs = [None] + list(duration_cache[: last_note_index - 1])
+
     # Get all note vectors within the window
-    pitch_list = [(note.octave, note.get_midi_note_number()) for note in chord_notes]
-    min_pitch = min(pitch_list)
-    max_pitch = max(pitch_list)
+    if note_array is None:
+        chord_note_array = get_note_array(chord_notes)
+    else:
+        chord_note_array = note_array[first_note_index:last_note_index]
+    octaves = chord_note_array["octave"]
+    midi_note_numbers = chord_note_array["midi_note_number"]
+    pitch_order = np.lexsort((midi_note_numbers, octaves))
+    min_pitch = (int(octaves[pitch_order[0]]), int(midi_note_numbers[pitch_order[0]]))
+    max_pitch = (int(octaves[pitch_order[-1]]), int(midi_note_numbers[pitch_order[-1]]))
 
     if duration_cache is None or not chord_onset_aligns:
         note_onsets = np.full(len(chord_notes), None)
+    elif onset_ticks is not None:
+        note_onsets = [
+            Fraction(int(ticks), ticks_per_whole_note)
+            for ticks in onset_ticks[first_note_index:last_note_index] - onset_ticks[change_index]
+        ]
     else:
         note_onsets = []
         for note_index in range(first_note_index, last_note_index):
@@ -132,26 +187,18 @@ def get_chord_note_input(
                 note_onset = Fraction(0)
             note_onsets.append(note_onset)
 
-    note_vectors = np.vstack(
-        [
-            note.to_vec(
-                chord_onset=chord_onset if chord_onset_aligns else chord.onset,
-                chord_offset=chord_offset if chord_offset_aligns else chord.offset,
-                chord_duration=chord_duration,
-                measures_df=measures_df,
-                min_pitch=min_pitch,
-                max_pitch=max_pitch,
-                note_onset=note_onset,
-                dur_from_prev=from_prev,
-                dur_to_next=to_next,
-            )
-            for note, note_onset, from_prev, to_next in zip(
-                chord_notes,
-                note_onsets,
-                dur_from_prevs[first_note_index:last_note_index],
-                dur_to_nexts[first_note_index:last_note_index],
-            )
-        ]
+    note_vectors = get_note_vectors(
+        chord_notes,
+        dur_from_prev=dur_from_prevs,
+        dur_to_next=dur_to_nexts,
+        chord_onset=chord_onset if chord_onset_aligns else chord.onset,
+        chord_offset=chord_offset if chord_offset_aligns else chord.offset,
+        chord_duration=chord_duration,
+        measures_df=measures_df,
+        min_pitch=min_pitch,
+        max_pitch=max_pitch,
+        note_onsets=note_onsets,
+        note_array=chord_note_array,
     )
 
     # Place the note vectors within the final tensor and return
@@ -185,6 +232,77 @@ def get_range_start(onset: Union[float, Tuple[int, Fraction]], notes: List[Note]
     return len(notes)
 
 
+def get_range_starts(
+    onsets: Iterable[Union[float, Tuple[int, Fraction]]], notes: List[Note]
+) -> List[int]:
+    """
+    Get the index of the first note whose offset is after each given range onset. This is
+    equivalent to [get_range_start(onset, notes) for onset in onsets], but uses a binary
+    search for each onset rather than a linear scan.
+
+    Parameters
+    ----------
+    onsets : Iterable[Union[float, Tuple[int, Fraction]]]
+        The onset times of some ranges.
+    notes : List[Note]
+        A List of the Notes of a piece.
+
+    Returns
+    -------
+    starts : List[int]
+        For each given onset, the index of the first note whose offset is after it.
+    """
+    # The first note with onset >= x (or offset > x) is the first note at which the running
+    # maximum onset (or offset) reaches that value. The running maxima are sorted.
+    max_onsets = list(accumulate((note.onset for note in notes), max))
+    max_offsets = list(accumulate((note.offset for note in notes), max))
+
+    return [
+        min(bisect.bisect_left(max_onsets, onset), bisect.bisect_right(max_offsets, onset))
+        for onset in onsets
+    ]
+
+
+def get_chord_changes(
+    chord_onsets: List[Union[float, Tuple[int, Fraction]]], notes: List[Note]
+) -> np.array:
+    """
+    Get the index of the note at which each of the given (sorted) chord onsets occurs: the
+    first note (after the previous chord's change index) whose onset is not before the chord's
+    onset, or the last note if there is none.
+
+    Parameters
+    ----------
+    chord_onsets : List[Union[float, Tuple[int, Fraction]]]
+        The onset times of the chords of a piece, in order.
+    notes : List[Note]
+        A List of the Notes of a piece.
+
+    Returns
+    -------
+    chord_changes : np.array
+        The index of the note at which each chord changes.
+    """
+    chord_changes = np.zeros(len(chord_onsets), dtype=int)
+    if len(notes) == 0:
+        return chord_changes
+
+    note_onsets = [note.onset for note in notes]
+
+    if all(map(operator.le, note_onsets[:-1], note_onsets[1:])):
+        # Sorted notes: binary search each chord onset
+        chord_changes[:] = [bisect.bisect_left(note_onsets, onset) for onset in chord_onsets]
+        return np.minimum(np.maximum.accumulate(chord_changes), len(notes) - 1)
+
+    note_index = 0
+    for chord_index, chord_onset in enumerate(chord_onsets):
+        while note_index + 1 < len(notes) and note_onsets[note_index] < chord_onset:
+            note_index += 1
+        chord_changes[chord_index] = note_index
+
+    return chord_changes
+
+
 class Piece:
     """
     A single musical piece, which can be from score, midi, or audio.
@@ -204,6 +322,15 @@ class Piece:
         self.DATA_TYPE = data_type
         self.name = name
 
+        # Caches of the (expensive) note vectors, which are shared by every dataset
+        # created from this Piece
+        self.note_matrix = None
+        self.chord_note_windows = {}
+
+        # The structured array of the inputs' pitches and metrical levels, from
+        # note.get_note_array(...), if a subclass builds it along with its Note inputs
+        self.note_array = None
+
     def get_inputs(self) -> List[Note]:
         """
         Get a list of the inputs for this Piece.
@@ -215,6 +342,29 @@ class Piece:
         """
         raise NotImplementedError
 
+    def get_note_matrix(self) -> np.array:
+        """
+        Get the vectors of all of this Piece's inputs, including each input's duration from
+        the previous input and to the next input, but without any chord-relative information.
+        The matrix is computed once and cached.
+
+        Returns
+        -------
+        note_matrix : np.array
+            A (num_inputs, note_vector_length) array containing the vector of each input.
+        """
+        if self.note_matrix is None:
+            duration_cache = list(self.get_duration_cache())
+
+            self.note_matrix = get_note_vectors(
+                self.get_inputs(),
+                dur_from_prev=[None] + duration_cache[:-1],
+                dur_to_next=duration_cache,
+                note_array=self.note_array,
+            )
+
+        return self.note_matrix
+
     def get_chord_change_indices(self) -> List[int]:
         """
         Get a List of the indexes (into the input list) at which there are chord changes.
@@ -275,9 +425,9 @@ class Piece:
         if chords is None:
             return []
 
-        chord_change_indices = self.get_chord_change_indices()
+        chord_change_indices = np.asarray(self.get_chord_change_indices(), dtype=np.int64)
 
-        start_index = bisect.bisect_left(chord_change_indices, start)
+        start_index = int(np.searchsorted(chord_change_indices, start, side="left"))
         if start_index == len(chord_change_indices) or chord_change_indices[start_index] != start:
             # Subtract 1 to get end of partial chord if exact match is not found
             start_index -= 1
@@ -285,7 +435,8 @@ class Piece:
         if stop is None:
             return chords[start_index:]
 
-        end_index = bisect.bisect_left(chord_change_indices, stop, lo=max(start_index, 0))
+        lo = max(start_index, 0)
+        end_index = lo + int(np.searchsorted(chord_change_indices[lo:], stop, side="left"))
 
         return chords[start_index:end_index]
 
@@ -294,12 +445,17 @@ class Piece:
         window: int = 2,
         ranges: List[Tuple[int, int]] = None,
         change_indices: List[int] = None,
+        num_workers: int = 1,
     ) -> np.array:
         """
         Get a list of the note input vectors for each chord in this piece, using an optional
         window on both sides. The ith element in the returned array will be an nd-array of
         size (2 * window + num_notes, note_vector_length).
 
+        When using the ground truth chord ranges and change indices, the inputs for each
+        window size are computed once and cached. The cached arrays are shared by every call,
+        so they are read-only: copy them before modifying them in place.
+
         Parameters
         ----------
         window : int
@@ -310,6 +466,9 @@ class Piece:
             chord symbols themselves.
         change_indices : List[int]
             A List of the note whose onset is the onset of each chord range.
+        num_workers : int
+            The number of threads to use to generate the chord inputs. If 1, they are
+            generated serially.
 
         Returns
         -------
@@ -386,6 +545,7 @@ class ScorePiece(Piece):
         chord_ranges: List[Tuple[int, int]],
         key_changes: List[int],
         name: str = None,
+        measures: Dict[int, Dict] = None,
     ):
         """
         Create a new ScorePiece.
@@ -408,42 +568,69 @@ class ScorePiece(Piece):
             A list of the indexes at which there are key changes in the piece.
         name : str
             A string identifier for this piece.
+        measures : Dict[int, Dict]
+            The rhythmic_utils.get_measures_dict(...) snapshot of measures_df, if it has
+            already been built. If None, it is built from measures_df.
         """
         super().__init__(PieceType.SCORE, name=name)
         self.duration_cache = None
+        self.onset_ticks = None
+        self.ticks_per_whole_note = None
 
         self.measures_df = measures_df
+        self.measures = ru.get_measures_dict(measures_df) if measures is None else measures
+        self.measure_offset_cache = ru.build_measure_offset_cache(self.measures)
 
         self.notes = np.array(notes)
+        self.note_array = get_note_array(self.notes)
         self.chords = np.array(chords) if chords is not None else None
         self.keys = np.array(keys) if keys is not None else None
-        self.chord_changes = np.array(chord_changes) if chord_changes is not None else None
+        self.chord_changes = (
+            np.asarray(chord_changes, dtype=np.int64) if chord_changes is not None else None
+        )
         self.chord_ranges = np.array(chord_ranges) if chord_ranges is not None else None
         self.key_changes = np.array(key_changes) if key_changes is not None else None
 
     def get_duration_cache(self):
         if self.duration_cache is None:
-            fake_last_note = Note(
-                0,
-                0,
+            last_offset = (
                 self.chords[-1].offset
                 if self.chords is not None
-                else max(note.offset for note in self.notes),
-                0,
-                Fraction(0),
-                (0, Fraction(0)),
-                0,
-                PitchType.TPC,
+                else max(note.offset for note in self.notes)
             )
+            onsets = [note.onset for note in self.notes] + [last_offset]
 
-            self.duration_cache = np.array(
-                [
-                    ru.get_range_length(prev_note.onset, next_note.onset, self.measures_df)
-                    for prev_note, next_note in zip(
-                        self.notes, list(self.notes[1:]) + [fake_last_note]
+            try:
+                onset_ticks, ticks_per_whole_note = ru.get_position_ticks(
+                    onsets, self.measure_offset_cache
+                )
+            except (AttributeError, KeyError):
+                # Non-Fraction positions, or measures not reachable from the first measure
+                onset_ticks = None
+
+            if onset_ticks is None:
+                durations = [
+                    ru.get_range_length(
+                        prev_onset,
+                        next_onset,
+                        self.measures,
+                        offset_cache=self.measure_offset_cache,
                     )
+                    for prev_onset, next_onset in zip(onsets[:-1], onsets[1:])
                 ]
-            )
+                self.duration_cache = np.array(durations)
+            else:
+                # Only create one Fraction per distinct duration
+                duration_ticks, duration_indexes = np.unique(
+                    np.diff(onset_ticks), return_inverse=True
+                )
+                durations = np.empty(len(duration_ticks), dtype=object)
+                durations[:] = [
+                    Fraction(int(ticks), ticks_per_whole_note) for ticks in duration_ticks
+                ]
+                self.duration_cache = durations[duration_indexes]
+                self.onset_ticks = onset_ticks
+                self.ticks_per_whole_note = ticks_per_whole_note
 
         return self.duration_cache
 
@@ -464,7 +651,12 @@ class ScorePiece(Piece):
         window: int = 2,
         ranges: List[Tuple[int, int]] = None,
         change_indices: List[int] = None,
+        num_workers: int = 1,
     ):
+        use_cache = ranges is None and change_indices is None
+        if use_cache and window in self.chord_note_windows:
+            return list(self.chord_note_windows[window])
+
         use_real_chords = False
 
         if ranges is None:
@@ -483,39 +675,65 @@ class ScorePiece(Piece):
         )
         duration_cache = self.get_duration_cache()
 
-        chord_note_inputs = []
-        for (onset_index, offset_index), change_index, chord in tqdm(
-            zip(ranges, change_indices, chords),
-            desc="Generating chord classification inputs",
-            total=len(ranges),
-        ):
-            duration = (
-                np.sum(duration_cache[change_index:offset_index])
-                if chord is None
-                else chord.duration
-            )
+        def get_input(chord_range: Tuple[int, int], change_index: int, chord: Chord) -> np.array:
+            onset_index, offset_index = chord_range
+            if chord is not None:
+                duration = chord.duration
+            elif self.onset_ticks is not None:
+                duration = Fraction(
+                    int(self.onset_ticks[offset_index] - self.onset_ticks[change_index]),
+                    self.ticks_per_whole_note,
+                )
+            else:
+                duration = np.sum(duration_cache[change_index:offset_index])
             onset = self.notes[change_index].onset
             try:
                 offset = self.notes[offset_index].onset
             except IndexError:
                 offset = last_offset
 
-            chord_note_inputs.append(
-                get_chord_note_input(
-                    self.notes,
-                    self.measures_df,
-                    onset,
-                    offset,
-                    duration,
-                    change_index,
-                    onset_index,
-                    offset_index,
-                    window,
-                    duration_cache=duration_cache,
-                    chord=chord,
-                )
+            return get_chord_note_input(
+                self.notes,
+                self.measures,
+                onset,
+                offset,
+                duration,
+                change_index,
+                onset_index,
+                offset_index,
+                window,
+                duration_cache=duration_cache,
+                chord=chord,
+                onset_ticks=self.onset_ticks,
+                ticks_per_whole_note=self.ticks_per_whole_note,
+                note_array=self.note_array,
             )
 
+        if num_workers > 1:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                chord_note_inputs = list(
+                    tqdm(
+                        executor.map(get_input, ranges, change_indices, chords),
+                        desc="Generating chord classification inputs",
+                        total=len(ranges),
+                    )
+                )
+        else:
+            chord_note_inputs = [
+                get_input(*args)
+                for args in tqdm(
+                    zip(ranges, change_indices, chords),
+                    desc="Generating chord classification inputs",
+                    total=len(ranges),
+                )
+            ]
+
+        if use_cache:
+            for chord_note_input in chord_note_inputs:
+                chord_note_input.setflags(write=False)
+            self.chord_note_windows[window] = chord_note_inputs
+            return list(chord_note_inputs)
+
         return chord_note_inputs
 
     def get_key_change_indices(self) -> List[int]:
@@ -543,6 +761,41 @@ class ScorePiece(Piece):
             "key_changes": self.get_key_change_indices(),
         }
 
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Return a columnar representation of this ScorePiece, as a dictionary of numpy arrays
+        which can be saved without pickling (see save_arrays).
+
+        Returns
+        -------
+        arrays : Dict[str, np.ndarray]
+            A dictionary of the arrays of this Piece. Notes, chords, and keys are stored with
+            one array per field (see get_object_arrays), under the prefixes "notes", "chords",
+            and "keys". Chords and keys are omitted if this piece has no chords.
+        """
+        arrays = get_object_arrays(self.get_inputs(), "notes")
+
+        if self.get_chords() is not None:
+            arrays.update(get_object_arrays(self.get_chords(), "chords"))
+            arrays.update(get_object_arrays(self.get_keys(), "keys"))
+            arrays["chord_changes"] = np.asarray(self.get_chord_change_indices(), dtype=np.int64)
+            arrays["chord_ranges"] = np.asarray(self.get_chord_ranges(), dtype=np.int64)
+            arrays["key_changes"] = np.asarray(self.get_key_change_indices(), dtype=np.int64)
+
+        return arrays
+
+    def save_arrays(self, path: Union[str, Path]):
+        """
+        Save this ScorePiece's arrays (from to_arrays) into an uncompressed npz file. It can be
+        loaded with get_score_piece_from_arrays.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            The path of the npz file to write.
+        """
+        np.savez(path, **self.to_arrays())
+
 
 def get_score_piece_from_dict(
     measures_df: pd.DataFrame,
@@ -578,6 +831,199 @@ def get_score_piece_from_dict(
     )
 
 
+def get_object_arrays(objects: List[Union[Note, Chord, Key]], prefix: str) -> Dict[str, np.ndarray]:
+    """
+    Convert a List of Notes, Chords, or Keys into columnar numpy arrays, with one column per
+    field of their to_dict() representation.
+
+    Parameters
+    ----------
+    objects : List[Union[Note, Chord, Key]]
+        The objects to convert. They must all be of the same class.
+    prefix : str
+        A prefix to add to the name of each returned array.
+
+    Returns
+    -------
+    arrays : Dict[str, np.ndarray]
+        The columnar arrays of the given objects. Integer-valued fields are stacked into
+        a single (num_objects, num_columns) array "{prefix}_ints" of the smallest integer
+        dtype that fits them, whose column names are in "{prefix}_int_columns": enums are
+        stored by value, Fractions as "{field}_num" and "{field}_den" columns, and (mc, beat)
+        positions also with an "{field}_mc" column.
+        Float and string fields are stored in their own "{prefix}_{field}" arrays, with ""
+        for None strings. The field names and the kind of each field are stored in
+        "{prefix}_fields" and "{prefix}_kinds".
+    """
+    object_dicts = [obj.to_dict() for obj in objects]
+    fields = list(object_dicts[0].keys()) if len(object_dicts) > 0 else []
+
+    arrays = {}
+    int_columns = {}
+    kinds = []
+    for field in fields:
+        values = [object_dict[field] for object_dict in object_dicts]
+        example = next((value for value in values if value is not None), None)
+
+        if isinstance(example, Enum):
+            kind = type(example).__name__
+            int_columns[field] = [value.value for value in values]
+
+        elif isinstance(example, tuple):
+            kind = "position"
+            beats = [Fraction(beat) for _, beat in values]
+            int_columns[f"{field}_mc"] = [mc for mc, _ in values]
+            int_columns[f"{field}_num"] = [beat.numerator for beat in beats]
+            int_columns[f"{field}_den"] = [beat.denominator for beat in beats]
+
+        elif isinstance(example, Fraction):
+            kind = "fraction"
+            int_columns[f"{field}_num"] = [value.numerator for value in values]
+            int_columns[f"{field}_den"] = [value.denominator for value in values]
+
+        elif isinstance(example, (float, np.floating)):
+            kind = "float"
+            arrays[f"{prefix}_{field}"] = np.array(values, dtype=float)
+
+        elif example is None or isinstance(example, str):
+            kind = "str"
+            arrays[f"{prefix}_{field}"] = np.array(
+                ["" if value is None else value for value in values], dtype=str
+            )
+
+        else:
+            kind = "int"
+            int_columns[field] = values
+
+        kinds.append(kind)
+
+    arrays[f"{prefix}_fields"] = np.array(fields, dtype=str)
+    arrays[f"{prefix}_kinds"] = np.array(kinds, dtype=str)
+    arrays[f"{prefix}_int_columns"] = np.array(list(int_columns.keys()), dtype=str)
+    ints = (
+        np.array(list(int_columns.values()), dtype=np.int64)
+        .reshape(len(int_columns), len(object_dicts))
+        .T
+    )
+    if ints.size > 0:
+        # Store with the smallest dtype that fits every value
+        ints = ints.astype(
+            np.promote_types(np.min_scalar_type(ints.min()), np.min_scalar_type(ints.max()))
+        )
+    arrays[f"{prefix}_ints"] = np.ascontiguousarray(ints)
+
+    return arrays
+
+
+def get_objects_from_arrays(
+    arrays: Dict[str, np.ndarray],
+    prefix: str,
+    object_class: type,
+) -> List[Union[Note, Chord, Key]]:
+    """
+    Create a List of Notes, Chords, or Keys from columnar arrays created by get_object_arrays.
+
+    Parameters
+    ----------
+    arrays : Dict[str, np.ndarray]
+        The arrays created by get_object_arrays (or an np.load of a file of them).
+    prefix : str
+        The prefix that was used when creating the arrays.
+    object_class : type
+        The class of the objects to create: Note, Chord, or Key.
+
+    Returns
+    -------
+    objects : List[Union[Note, Chord, Key]]
+        The objects loaded from the given arrays.
+    """
+    fields = arrays[f"{prefix}_fields"].tolist()
+    kinds = arrays[f"{prefix}_kinds"].tolist()
+    int_columns = dict(
+        zip(arrays[f"{prefix}_int_columns"].tolist(), arrays[f"{prefix}_ints"].T.tolist())
+    )
+    enums = {enum.__name__: enum for enum in (ChordType, KeyMode, PitchType)}
+
+    columns = []
+    for field, kind in zip(fields, kinds):
+        if kind in ["position", "fraction"]:
+            column = [
+                Fraction(num, den)
+                for num, den in zip(int_columns[f"{field}_num"], int_columns[f"{field}_den"])
+            ]
+            if kind == "position":
+                column = list(zip(int_columns[f"{field}_mc"], column))
+
+        elif kind == "str":
+            column = [
+                None if value == "" else value for value in arrays[f"{prefix}_{field}"].tolist()
+            ]
+
+        elif kind == "float":
+            column = arrays[f"{prefix}_{field}"].tolist()
+
+        elif kind in enums:
+            column = [enums[kind](value) for value in int_columns[field]]
+
+        else:
+            column = int_columns[field]
+
+        columns.append(column)
+
+    return [object_class(**dict(zip(fields, values))) for values in zip(*columns)]
+
+
+def get_score_piece_from_arrays(
+    measures_df: pd.DataFrame,
+    arrays: Union[str, Path, Dict[str, np.ndarray]],
+    name: str = None,
+) -> ScorePiece:
+    """
+    Create and return a ScorePiece from columnar arrays, created by ScorePiece.to_arrays().
+
+    Parameters
+    ----------
+    measures_df : pd.DataFrame
+        A measures_df is required for metrical information when getting chord note inputs.
+    arrays : Union[str, Path, Dict[str, np.ndarray]]
+        The arrays created by ScorePiece.to_arrays(), or the path of an npz file written by
+        ScorePiece.save_arrays().
+    name : str
+        A string identifier for this piece.
+
+    Returns
+    -------
+    piece : ScorePiece
+        The ScorePiece, loaded from the arrays.
+    """
+    if isinstance(arrays, (str, Path)):
+        with np.load(arrays) as npz_file:
+            arrays = dict(npz_file)
+
+    if "chords_fields" not in arrays:
+        return ScorePiece(
+            measures_df,
+            get_objects_from_arrays(arrays, "notes", Note),
+            None,
+            None,
+            None,
+            None,
+            None,
+            name=name,
+        )
+
+    return ScorePiece(
+        measures_df,
+        get_objects_from_arrays(arrays, "notes", Note),
+        get_objects_from_arrays(arrays, "chords", Chord),
+        get_objects_from_arrays(arrays, "keys", Key),
+        arrays["chord_changes"],
+        arrays["chord_ranges"],
+        arrays["key_changes"],
+        name=name,
+    )
+
+
 def get_score_piece_from_data_frames(
     notes_df: pd.DataFrame,
     chords_df: pd.DataFrame,
@@ -619,24 +1065,17 @@ def get_score_piece_from_data_frames(
         The ScorePiece, loaded from the dataframes.
     """
     levels_cache = defaultdict(dict)
-    notes_list = np.array(
-        [
-            [note, note_id]
-            for note_id, note in enumerate(
-                notes_df.apply(
-                    Note.from_series,
-                    axis="columns",
-                    measures_df=measures_df,
-                    pitch_type=PitchType.TPC,
-                    levels_cache=levels_cache,
-                )
-            )
-            if note is not None
-        ]
-    )
-    notes, note_ilocs = np.hsplit(notes_list, 2)
-    notes = np.squeeze(notes)
-    note_ilocs = np.squeeze(note_ilocs).astype(int)
+    measures = ru.get_measures_dict(measures_df)
+    notes = [
+        Note.from_series(
+            note_row,
+            measures,
+            PitchType.TPC,
+            levels_cache=levels_cache,
+        )
+        for note_row in notes_df.to_dict("records")
+    ]
+    notes = np.array([note for note in notes if note is not None], dtype=object)
 
     if chords_df is None:
         # Quick check for pieces without ground truth chords
@@ -649,29 +1088,27 @@ def get_score_piece_from_data_frames(
             None,
             None,
             name=name,
+            measures=measures,
         )
 
-    chords_list = np.array(
-        [
-            [chord, chord_id]
-            for chord_id, chord in enumerate(
-                chords_df.apply(
-                    Chord.from_series,
-                    axis="columns",
-                    measures_df=measures_df,
-                    pitch_type=PitchType.TPC,
-                    levels_cache=levels_cache,
-                    reduction=chord_reduction,
-                    use_inversion=use_inversions,
-                    use_relative=use_relative,
-                )
+    chord_pairs = [
+        (chord, chord_id)
+        for chord_id, chord in enumerate(
+            Chord.from_series(
+                chord_row,
+                measures,
+                PitchType.TPC,
+                levels_cache=levels_cache,
+                reduction=chord_reduction,
+                use_inversion=use_inversions,
+                use_relative=use_relative,
             )
-            if chord is not None
-        ]
-    )
-    chords_list, chord_ilocs = np.hsplit(chords_list, 2)
-    chords_list = np.squeeze(chords_list)
-    chord_ilocs = np.squeeze(chord_ilocs).astype(int)
+            for chord_row in chords_df.to_dict("records")
+        )
+        if chord is not None
+    ]
+    chords_list = [chord for chord, _ in chord_pairs]
+    chord_ilocs = np.array([chord_id for _, chord_id in chord_pairs], dtype=int)
 
     # Remove accidentally repeated chords
     non_repeated_mask = get_reduction_mask(
@@ -687,22 +1124,19 @@ def get_score_piece_from_data_frames(
             chords.append(chord)
         else:
             chords[-1].merge_with(chord)
-    chords = np.array(chords)
+    chords = np.array(chords, dtype=object)
     chord_ilocs = chord_ilocs[non_repeated_mask]
 
     # The index of the notes where there is a chord change
-    chord_changes = np.zeros(len(chords), dtype=int)
-    note_index = 0
-    for chord_index, chord in enumerate(chords):
-        while note_index + 1 < len(notes) and notes[note_index].onset < chord.onset:
-            note_index += 1
-        chord_changes[chord_index] = note_index
+    chord_changes = get_chord_changes([chord.onset for chord in chords], notes)
 
     # The note input ranges for each chord
-    chord_ranges = [
-        (get_range_start(chord.onset, notes), end)
-        for chord, end in zip(chords, list(chord_changes[1:]) + [len(notes)])
-    ]
+    chord_ranges = list(
+        zip(
+            get_range_starts([chord.onset for chord in chords], notes),
+            list(chord_changes[1:]) + [len(notes)],
+        )
+    )
 
     key_cols = chords_df.loc[
         chords_df.index[chord_ilocs],
@@ -721,8 +1155,9 @@ def get_score_piece_from_data_frames(
     keys_list = np.array(
         [
             key
-            for key in chords_df.loc[chords_df.index[chord_ilocs[key_changes]]].apply(
-                Key.from_series, axis="columns", tonic_type=PitchType.TPC
+            for key in (
+                Key.from_series(chord_row, PitchType.TPC)
+                for chord_row in chords_df.iloc[chord_ilocs[key_changes]].to_dict("records")
             )
             if key is not None
         ]
@@ -742,6 +1177,7 @@ def get_score_piece_from_data_frames(
         chord_ranges,
         key_changes,
         name=name,
+        measures=measures,
     )
 
 
@@ -843,6 +1279,7 @@ def get_measures_df_from_music21_score(m21_score: music21.stream.Score) -> pd.Da
 def get_notes_from_music_xml(
     m21_score: music21.stream.Score,
     measures_df: pd.DataFrame,
+    measures: Dict[int, Dict] = None,
 ) -> List[Note]:
     """
     Get a list of Note objects from a music21 score that has already been parsed.
@@ -862,6 +1299,9 @@ def get_notes_from_music_xml(
             'mc_offset' (Fraction): The starting position of this measure, in whole notes
                                  after the most recent downbeat.
             'next' (int): The measure index of the measure that follows each one.
+    measures : Dict[int, Dict]
+        The rhythmic_utils.get_measures_dict(...) snapshot of measures_df, if it has already
+        been built. If None, it is built from measures_df.
 
     Returns
     -------
@@ -872,6 +1312,8 @@ def get_notes_from_music_xml(
     m21_score = m21_score.stripTies()
 
     levels_cache = defaultdict(dict)
+    if measures is None:
+        measures = ru.get_measures_dict(measures_df)
     notes = []
 
     for measure_mc, measures_list in enumerate(m21_score.measureOffsetMap().values()):
@@ -889,7 +1331,7 @@ def get_notes_from_music_xml(
                     notes.append(
                         Note.from_music21(
                             chord_note,
-                            measures_df,
+                            measures,
                             measure_mc,
                             pitch_type=PitchType.TPC,
                             m21_chord=chord,
@@ -900,7 +1342,7 @@ def get_notes_from_music_xml(
                 notes.append(
                     Note.from_music21(
                         note,
-                        measures_df,
+                        measures,
                         measure_mc,
                         pitch_type=PitchType.TPC,
                         levels_cache=levels_cache,
@@ -941,7 +1383,8 @@ def get_score_piece_from_music_xml(
     # Parse the score
     m21_score = parse(music_xml_path)
     measures_df = get_measures_df_from_music21_score(m21_score)
-    notes = get_notes_from_music_xml(m21_score, measures_df)
+    measures = ru.get_measures_dict(measures_df)
+    notes = get_notes_from_music_xml(m21_score, measures_df, measures=measures)
 
     if label_csv_path is None:
         return ScorePiece(
@@ -953,6 +1396,7 @@ def get_score_piece_from_music_xml(
             None,
             None,
             name=name,
+            measures=measures,
         )
 
     # Parse the labels csv
@@ -993,18 +1437,15 @@ def get_score_piece_from_music_xml(
         ]
     )
 
-    chord_changes = np.zeros(len(chords), dtype=int)
-    note_index = 0
-    for chord_index, chord in enumerate(chords):
-        while note_index + 1 < len(notes) and notes[note_index].onset < chord.onset:
-            note_index += 1
-        chord_changes[chord_index] = note_index
+    chord_changes = get_chord_changes([chord.onset for chord in chords], notes)
 
     # The note input ranges for each chord
-    chord_ranges = [
-        (get_range_start(chord.onset, notes), end)
-        for chord, end in zip(chords, list(chord_changes[1:]) + [len(notes)])
-    ]
+    chord_ranges = list(
+        zip(
+            get_range_starts([chord.onset for chord in chords], notes),
+            list(chord_changes[1:]) + [len(notes)],
+        )
+    )
 
     global_key = Key.from_labels_csv_row(labels_df.iloc[0], PitchType.TPC)
     keys = np.array(
@@ -1032,4 +1473,5 @@ def get_score_piece_from_music_xml(
         chord_ranges,
         key_changes,
         name=name,
+        measures=measures,
     )
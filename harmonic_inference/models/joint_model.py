@@ -25,7 +25,7 @@ import harmonic_inference.utils.harmonic_constants as hc
 import harmonic_inference.utils.harmonic_utils as hu
 from harmonic_inference.data.chord import get_chord_vector_length
 from harmonic_inference.data.data_types import KeyMode, PitchType
-from harmonic_inference.data.piece import Piece, get_range_start
+from harmonic_inference.data.piece import Piece, get_range_starts
 from harmonic_inference.utils.beam_search_utils import Beam, HashedBeam, State
 
 MODEL_CLASSES = {
@@ -605,10 +605,15 @@ class HarmonicInferenceModel:
 
         # Convert range starting points to new starts based on the note offsets
         chord_change_indices = [start for start, _ in chord_ranges]
-        chord_windows = [
-            (get_range_start(piece.get_inputs()[start].onset, piece.get_inputs()), end)
-            for start, end in chord_ranges
-        ]
+        chord_windows = list(
+            zip(
+                get_range_starts(
+                    [piece.get_inputs()[start].onset for start, _ in chord_ranges],
+                    piece.get_inputs(),
+                ),
+                [end for _, end in chord_ranges],
+            )
+        )
 
         # Calculate chord priors for each possible chord range (batched, with CCM)
         logging.info("Classifying chords")
@@ -34,19 +34,13 @@ def remove_unmatched(dataframe: pd.DataFrame, measures: pd.DataFrame) -> pd.Data
         A copy of the given dataframe, with any row which does not correspond to a measure
         from the measures DataFrame removed.
     """
-    # List of columns that are indexes for the given dataframe, in order to re-index after merge
-    index_list = list(dataframe.index.names)
-
-    # Inner merge removes unmatched rows from the given dataframe
-    merged = pd.merge(
-        dataframe.loc[:, "mc"].reset_index(),
-        measures.loc[:, "mc"],
-        how="inner",
-        on=["file_id", "mc"],
+    # A (file_id, mc) membership test, rather than a merge, keeps only the key columns in memory
+    measure_keys = pd.MultiIndex.from_arrays(
+        [measures.index.get_level_values("file_id"), measures["mc"]]
     )
-    merged_index = merged.set_index(index_list).index
+    keys = pd.MultiIndex.from_arrays([dataframe.index.get_level_values("file_id"), dataframe["mc"]])
 
-    return dataframe.loc[merged_index].copy()
+    return dataframe.loc[keys.isin(measure_keys)].copy()
 
 
 def remove_repeats(measures: pd.DataFrame, remove_unreachable: bool = True) -> pd.DataFrame:
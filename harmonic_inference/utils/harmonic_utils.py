@@ -1,6 +1,6 @@
 """Utility functions for getting harmonic and pitch information from the corpus DataFrames."""
 import itertools
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Iterable, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -391,6 +391,95 @@ def get_chord_one_hot_index(
     return index
 
 
+def get_chord_one_hot_indexes(
+    chord_types: Iterable[ChordType],
+    root_pitches: Iterable[int],
+    pitch_type: PitchType,
+    inversions: Iterable[int] = None,
+    use_inversion: bool = True,
+    relative: bool = False,
+    pad: bool = False,
+    reduction: Dict[ChordType, ChordType] = None,
+) -> np.ndarray:
+    """
+    Get the one hot indexes of many chords at once. This is equivalent to (but much faster
+    than) calling get_chord_one_hot_index on each chord individually.
+
+    Parameters
+    ----------
+    chord_types : Iterable[ChordType]
+        The chord type of each chord.
+    root_pitches : Iterable[int]
+        The pitch of the root of each chord, either as an absolute or relative pitch,
+        depending on `relative`.
+    pitch_type : int
+        The representation used for `root_pitches`.
+    inversions : Iterable[int]
+        The inversion of each chord. Used only if use_inversion is True. If None, all chords
+        are assumed to be in root position.
+    use_inversion : inv
+        True to take the chords' inversions into acccount.
+    relative : bool
+        True to get the chords' relative one-hot indexes. False for absolute.
+    pad : bool
+        If True, pitch_type is TPC, and relative is True, add extra pitches to the number
+        of possible chord roots.
+    reduction : Dict[ChordType, ChordType]
+        A reduction for the chord_types.
+
+    Returns
+    -------
+    indexes : np.ndarray
+        The index of each given chord's label in the list of all possible chord labels.
+    """
+    if reduction is None:
+        reduction = NO_REDUCTION
+
+    reduced_types = sorted(set(reduction.values()))
+    type_indexes = {chord_type: index for index, chord_type in enumerate(reduced_types)}
+
+    chord_type_indexes = np.array(
+        [type_indexes[reduction[chord_type]] for chord_type in chord_types], dtype=int
+    )
+    root_pitches = np.array(root_pitches, dtype=int).reshape(-1)
+
+    if pitch_type == PitchType.MIDI or not relative:
+        num_pitches = hc.NUM_PITCHES[pitch_type]
+    else:
+        num_pitches = hc.MAX_RELATIVE_TPC - hc.MIN_RELATIVE_TPC
+        if pad:
+            num_pitches += 2 * hc.RELATIVE_TPC_EXTRA
+
+    invalid_roots = (root_pitches < 0) | (root_pitches >= num_pitches)
+    if np.any(invalid_roots):
+        raise ValueError(
+            f"Given root ({root_pitches[np.argmax(invalid_roots)]}) is outside of valid range"
+        )
+
+    if use_inversion:
+        chord_inversions = np.array(
+            [get_chord_inversion_count(chord) for chord in reduced_types], dtype=int
+        )
+    else:
+        chord_inversions = np.ones(len(reduced_types), dtype=int)
+
+    type_offsets = num_pitches * np.concatenate(([0], np.cumsum(chord_inversions)[:-1]))
+    indexes = type_offsets[chord_type_indexes] + chord_inversions[chord_type_indexes] * root_pitches
+
+    if use_inversion and inversions is not None:
+        inversions = np.array(inversions, dtype=int).reshape(-1)
+        invalid_inversions = (inversions < 0) | (inversions >= chord_inversions[chord_type_indexes])
+        if np.any(invalid_inversions):
+            invalid_index = np.argmax(invalid_inversions)
+            raise ValueError(
+                f"inversion {inversions[invalid_index]} outside of valid range for chord "
+                f"{reduced_types[chord_type_indexes[invalid_index]]}"
+            )
+        indexes += inversions
+
+    return indexes
+
+
 def get_key_label_list(
     pitch_type: PitchType,
     relative: bool = False,
@@ -900,7 +989,9 @@ def get_scale_degree_from_interval(interval: int, mode: KeyMode, pitch_type: Pit
     )
 
 
-def transpose_pitch(pitch: int, interval: int, pitch_type: PitchType) -> int:
+def transpose_pitch(
+    pitch: int, interval: Union[int, np.ndarray], pitch_type: PitchType
+) -> Union[int, np.ndarray]:
     """
     Transpose the given pitch by the given interval.
 
@@ -908,8 +999,9 @@ def transpose_pitch(pitch: int, interval: int, pitch_type: PitchType) -> int:
     ----------
     pitch : int
         The original pitch.
-    interval : int
-        The amount to transpose the given pitch by.
+    interval : Union[int, np.ndarray]
+        The amount to transpose the given pitch by. If this is an array of intervals, the
+        returned value is an array of the given pitch transposed by each interval.
     pitch_type : PitchType
         The pitch type. If MIDI, the returned pitch will be on the range [0, 12), and the given
         interval is interpreted as semitones, which is modded to fall in the range. If TPC, the
@@ -919,14 +1011,14 @@ def transpose_pitch(pitch: int, interval: int, pitch_type: PitchType) -> int:
 
     Returns
     -------
-    pitch : int
-        The given pitch, transposed by the given interval.
+    pitch : Union[int, np.ndarray]
+        The given pitch, transposed by the given interval (or intervals).
     """
     if pitch_type == PitchType.MIDI:
         return (pitch + interval) % hc.NUM_PITCHES[PitchType.MIDI]
     pitch = pitch + interval
 
-    if pitch < 0 or pitch >= hc.NUM_PITCHES[PitchType.TPC]:
+    if np.any(pitch < 0) or np.any(pitch >= hc.NUM_PITCHES[PitchType.TPC]):
         raise ValueError(
             f"pitch_type is TPC but transposed pitch {pitch} lies outside of TPC " "range."
         )
@@ -1,14 +1,190 @@
 """Utility functions for getting rhythmic or metrical information from the corpus DataFrames."""
+import math
 from fractions import Fraction
-from typing import Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from harmonic_inference.data.corpus_constants import MEASURE_OFFSET, NOTE_ONSET_BEAT
 
+# Above this resolution, tick positions are kept as Python ints to rule out int64 overflow
+MAX_INT64_TICKS_PER_WHOLE_NOTE = 2 ** 31
+
+
+def get_measures_dict(measures: pd.DataFrame) -> Dict[int, Dict[str, Any]]:
+    """
+    Get a snapshot of the given measures DataFrame as plain Python dictionaries, which are much
+    faster to look measures up in than the DataFrame itself. The result can be passed to any
+    function in this module (and to Note and Chord creation functions) in place of the
+    measures DataFrame.
+
+    Parameters
+    ----------
+    measures : pd.DataFrame
+        A DataFrame containing the measures info for this particular piece.
+
+    Returns
+    -------
+    measures_dict : Dict[int, Dict[str, Any]]
+        A dictionary mapping each measure's mc to a dictionary of that measure's row of the
+        given DataFrame (including 'mc'), keyed by column name.
+    """
+    return {measure["mc"]: measure for measure in measures.to_dict("records")}
+
+
+def get_measure(
+    measures: Union[pd.DataFrame, Dict[int, Dict[str, Any]]], mc: int
+) -> Union[pd.Series, Dict[str, Any]]:
+    """
+    Get the row of the measure with the given mc.
+
+    Parameters
+    ----------
+    measures : Union[pd.DataFrame, Dict[int, Dict[str, Any]]]
+        A DataFrame containing the measures info for this particular piece, or its snapshot
+        from get_measures_dict(...).
+    mc : int
+        The mc of the measure to get.
+
+    Returns
+    -------
+    measure : Union[pd.Series, Dict[str, Any]]
+        The given measure's row, as a pd.Series if measures is a DataFrame, or as a dictionary
+        otherwise. In either case, its values can be accessed as measure[column_name].
+    """
+    if isinstance(measures, dict):
+        return measures[mc]
+    return measures.loc[measures["mc"] == mc].iloc[0]
+
+
+def build_measure_offset_cache(
+    measures: Union[pd.DataFrame, Dict[int, Dict[str, Any]]]
+) -> Dict[int, Fraction]:
+    """
+    Get the position of each measure in the given piece, in whole notes from the start of the
+    piece, by following the measures' "next" pointers once from the first measure.
+
+    Parameters
+    ----------
+    measures : Union[pd.DataFrame, Dict[int, Dict[str, Any]]]
+        A DataFrame containing the measures info for this particular piece, or its snapshot
+        from get_measures_dict(...).
+
+    Returns
+    -------
+    offset_cache : Dict[int, Fraction]
+        A dictionary mapping each reachable mc to the position of beat 0 of that measure (so
+        that a position (mc, beat) lies at offset_cache[mc] + beat), in whole notes from the
+        start of the piece. This can be passed to get_range_length(...).
+    """
+    if isinstance(measures, pd.DataFrame):
+        measures = get_measures_dict(measures)
+
+    offset_cache = {}
+    if len(measures) == 0:
+        return offset_cache
+
+    position = 0
+    current_mc = next(iter(measures))
+    while current_mc in measures and current_mc not in offset_cache:
+        measure = measures[current_mc]
+        offset_cache[current_mc] = position - measure[MEASURE_OFFSET]
+        position += measure["act_dur"]
+        current_mc = measure["next"]
+        if pd.isna(current_mc):
+            break
+
+    return offset_cache
+
+
+def get_ticks_per_whole_note(values: Iterable[Union[int, Fraction]]) -> int:
+    """
+    Get the smallest number of ticks per whole note with which all of the given durations or
+    positions can be represented exactly as integers.
+
+    Parameters
+    ----------
+    values : Iterable[Union[int, Fraction]]
+        Durations or positions, in whole notes.
+
+    Returns
+    -------
+    ticks_per_whole_note : int
+        The least common multiple of the denominators of all of the given values.
+    """
+    return math.lcm(1, *{value.denominator for value in values})
+
+
+def to_ticks(value: Union[int, Fraction], ticks_per_whole_note: int) -> int:
+    """
+    Convert the given duration or position from whole notes to integer ticks.
+
+    Parameters
+    ----------
+    value : Union[int, Fraction]
+        A duration or position, in whole notes.
+    ticks_per_whole_note : int
+        The number of ticks per whole note. This must be a multiple of value's denominator.
+
+    Returns
+    -------
+    ticks : int
+        The given value, in ticks.
+    """
+    ticks_per_denominator, remainder = divmod(ticks_per_whole_note, value.denominator)
+    if remainder != 0:
+        raise ValueError(f"{value} cannot be represented with {ticks_per_whole_note} ticks.")
+    return int(value.numerator) * ticks_per_denominator
+
+
+def get_position_ticks(
+    positions: Iterable[Tuple[int, Fraction]], offset_cache: Dict[int, Fraction]
+) -> Tuple[np.ndarray, int]:
+    """
+    Convert the given (mc, beat) positions into integer ticks since the start of the piece,
+    so that range lengths can be computed with integer arithmetic rather than with Fractions.
+
+    Parameters
+    ----------
+    positions : Iterable[Tuple[int, Fraction]]
+        (mc, beat) tuples of positions within a piece. Each mc must be in offset_cache.
+    offset_cache : Dict[int, Fraction]
+        The measure positions of this piece, from build_measure_offset_cache(...).
+
+    Returns
+    -------
+    position_ticks : np.ndarray
+        The position of each given (mc, beat) tuple, in ticks since the start of the piece.
+        The length of a range is the difference of the ticks of its end and start. This is
+        an int64 array, unless the tick resolution is too fine to rule out an overflow, in
+        which case it is an object array of Python ints.
+    ticks_per_whole_note : int
+        The number of ticks per whole note used, from get_ticks_per_whole_note(...).
+    """
+    positions = list(positions)
+    beats = [beat for _, beat in positions]
+    ticks_per_whole_note = get_ticks_per_whole_note(list(offset_cache.values()) + beats)
+    dtype = np.int64 if ticks_per_whole_note < MAX_INT64_TICKS_PER_WHOLE_NOTE else object
+
+    measure_ticks = {
+        mc: to_ticks(offset, ticks_per_whole_note) for mc, offset in offset_cache.items()
+    }
+    position_ticks = np.array([measure_ticks[mc] for mc, _ in positions], dtype=dtype)
+
+    numerators = np.array([beat.numerator for beat in beats], dtype=dtype)
+    denominators = np.array([beat.denominator for beat in beats], dtype=dtype)
+    position_ticks += numerators * (ticks_per_whole_note // denominators)
+
+    return position_ticks, ticks_per_whole_note
+
 
 def get_range_length(
-    range_start: Tuple[int, Fraction], range_end: Tuple[int, Fraction], measures: pd.DataFrame
+    range_start: Tuple[int, Fraction],
+    range_end: Tuple[int, Fraction],
+    measures: Union[pd.DataFrame, Dict[int, Dict[str, Any]]],
+    offset_cache: Dict[int, Fraction] = None,
 ) -> Fraction:
     """
     Get the length of a range in whole notes.
@@ -21,14 +197,24 @@ def get_range_length(
     range_end : tuple(int, Fraction)
         A tuple of (mc, beat) values of the end of the range.
 
-    measures : pd.DataFrame
-        A DataFrame containing the measures info for this particular piece.
+    measures : Union[pd.DataFrame, Dict[int, Dict[str, Any]]]
+        A DataFrame containing the measures info for this particular piece, or its snapshot
+        from get_measures_dict(...).
+
+    offset_cache : Dict[int, Fraction]
+        The measure positions of this piece, from build_measure_offset_cache(measures). If
+        given (and it contains both mcs), it is used instead of walking through the measures.
 
     Returns
     -------
     length : Fraction
         The length of the given range, in whole notes.
     """
+    if offset_cache is not None and range_start[0] in offset_cache and range_end[0] in offset_cache:
+        return (offset_cache[range_end[0]] + range_end[1]) - (
+            offset_cache[range_start[0]] + range_start[1]
+        )
+
     factor = 1
     if range_start > range_end:
         factor = -1
@@ -43,21 +229,18 @@ def get_range_length(
         return factor * (end_beat - start_beat)
 
     # Start looping at end of start_mc
-    act_dur, offset, current_mc = measures.loc[
-        measures["mc"] == start_mc, ["act_dur", MEASURE_OFFSET, "next"]
-    ].values[0]
-    length = act_dur + offset - start_beat
+    measure = get_measure(measures, start_mc)
+    current_mc = measure["next"]
+    length = measure["act_dur"] + measure[MEASURE_OFFSET] - start_beat
 
     # Loop until reaching end_mc
     while current_mc != end_mc and current_mc is not None:
-        act_dur, current_mc = measures.loc[
-            measures["mc"] == current_mc, ["act_dur", "next"]
-        ].values[0]
-        length += act_dur
+        measure = get_measure(measures, current_mc)
+        current_mc = measure["next"]
+        length += measure["act_dur"]
 
     # Add remainder
-    final_offset = measures.loc[measures["mc"] == current_mc, MEASURE_OFFSET].values[0]
-    length += end_beat - final_offset
+    length += end_beat - get_measure(measures, current_mc)[MEASURE_OFFSET]
 
     return factor * length
 
@@ -66,8 +249,9 @@ def get_rhythmic_info_as_proportion_of_range(
     note: pd.Series,
     range_start: Tuple[int, Fraction],
     range_end: Tuple[int, Fraction],
-    measures: pd.DataFrame,
+    measures: Union[pd.DataFrame, Dict[int, Dict[str, Any]]],
     range_len: Fraction = None,
+    offset_cache: Dict[int, Fraction] = None,
 ) -> Tuple[Fraction, Fraction, Fraction]:
     """
     Get a note's onset, offset, and duration as a proportion of the given range.
@@ -83,12 +267,17 @@ def get_rhythmic_info_as_proportion_of_range(
     range_end : tuple(int, Fraction)
         A tuple of (mc, beat) values of the end of the range.
 
-    measures : pd.DataFrame
-        A DataFrame containing the measures info for the the corpus.
+    measures : Union[pd.DataFrame, Dict[int, Dict[str, Any]]]
+        A DataFrame containing the measures info for the the corpus, or its snapshot from
+        get_measures_dict(...).
 
     range_len : Fraction
         The total duration of the given range, if it is known.
 
+    offset_cache : Dict[int, Fraction]
+        The measure positions of this piece, from build_measure_offset_cache(measures),
+        to speed up range length computations.
+
     Returns
     -------
     onset : Fraction
@@ -101,7 +290,7 @@ def get_rhythmic_info_as_proportion_of_range(
         The duration of the note, as a proportion of the given range.
     """
     if range_len is None:
-        range_len = get_range_length(range_start, range_end, measures)
+        range_len = get_range_length(range_start, range_end, measures, offset_cache=offset_cache)
 
     duration = note["duration"] / range_len
 
@@ -109,22 +298,37 @@ def get_rhythmic_info_as_proportion_of_range(
     onset_to_end = abs(note["mc"] - range_end[0])
     if onset_to_start <= onset_to_end:
         onset = (
-            get_range_length(range_start, (note["mc"], note[NOTE_ONSET_BEAT]), measures) / range_len
+            get_range_length(
+                range_start,
+                (note["mc"], note[NOTE_ONSET_BEAT]),
+                measures,
+                offset_cache=offset_cache,
+            )
+            / range_len
         )
     else:
         onset = (
             1
-            - get_range_length((note["mc"], note[NOTE_ONSET_BEAT]), range_end, measures) / range_len
+            - get_range_length(
+                (note["mc"], note[NOTE_ONSET_BEAT]),
+                range_end,
+                measures,
+                offset_cache=offset_cache,
+            )
+            / range_len
         )
     offset = onset + duration
 
     return onset, offset, duration
 
 
+@lru_cache(maxsize=64)
 def get_metrical_level_lengths(timesig: str) -> Tuple[Fraction, Fraction, Fraction]:
     """
     Get the lengths of the beat and subbeat levels of the given time signature.
 
+    The results are cached by time signature, since a piece typically only has a few.
+
     Parameters
     ----------
     timesig : string
@@ -155,7 +359,7 @@ def get_metrical_level_lengths(timesig: str) -> Tuple[Fraction, Fraction, Fracti
     return Fraction(numerator, denominator), beat_length, sub_beat_length
 
 
-def get_metrical_level(beat: Fraction, measure: pd.Series) -> int:
+def get_metrical_level(beat: Fraction, measure: Union[pd.Series, Dict[str, Any]]) -> int:
     """
     Get the metrical level of a given beat.
 
@@ -165,8 +369,9 @@ def get_metrical_level(beat: Fraction, measure: pd.Series) -> int:
         The beat we are interested in within the measure. 1 corresponds to a whole
         note after the downbeat.
 
-    measure : pd.Series
-        The measures_df row of the corresponding mc.
+    measure : Union[pd.Series, Dict[str, Any]]
+        The measures_df row of the corresponding mc (or its dictionary from
+        get_measures_dict(...)).
 
     Returns
     -------
@@ -177,12 +382,81 @@ def get_metrical_level(beat: Fraction, measure: pd.Series) -> int:
         1: sub-beat
         0: lower
     """
-    measure_length, beat_length, sub_beat_length = get_metrical_level_lengths(measure["timesig"])
+    try:
+        numerator, denominator = beat.numerator, beat.denominator
+    except AttributeError:
+        measure_length, beat_length, sub_beat_length = get_metrical_level_lengths(
+            measure["timesig"]
+        )
+        if is_multiple(beat, measure_length):
+            return 3
+        if is_multiple(beat, beat_length):
+            return 2
+        if is_multiple(beat, sub_beat_length):
+            return 1
+        return 0
+
+    sub_beat_length, level_table = get_metrical_level_table(measure["timesig"])
+    sub_beat_index, remainder = divmod(
+        numerator * sub_beat_length.denominator, denominator * sub_beat_length.numerator
+    )
+    if remainder != 0:
+        return 0
+    return level_table[sub_beat_index % len(level_table)]
+
+
+@lru_cache(maxsize=64)
+def get_metrical_level_table(timesig: str) -> Tuple[Fraction, Tuple[int, ...]]:
+    """
+    Get a table of the metrical level of each sub-beat of a measure in the given time
+    signature, so that the level of any beat can be looked up with integer arithmetic.
+
+    The results are cached by time signature, since a piece typically only has a few.
+
+    Parameters
+    ----------
+    timesig : string
+        A string representation of the time signature as "numerator/denominator".
+
+    Returns
+    -------
+    sub_beat_length : Fraction
+        The length of a sub_beat in the given time signature, where 1 is a whole note.
+
+    level_table : Tuple[int, ...]
+        The metrical level (see get_metrical_level) of each sub-beat of a measure. Its
+        length is the number of sub-beats per measure.
+    """
+    measure_length, beat_length, sub_beat_length = get_metrical_level_lengths(timesig)
+
+    level_table = np.ones(int(measure_length / sub_beat_length), dtype=np.int8)
+    level_table[:: int(beat_length / sub_beat_length)] = 2
+    level_table[0] = 3
+
+    return sub_beat_length, tuple(level_table.tolist())
+
+
+def is_multiple(value: Union[int, Fraction], length: Fraction) -> bool:
+    """
+    Check whether the given value is an integer multiple of the given length, i.e., whether
+    value % length == 0. For rational values, this is computed with integer arithmetic on
+    the numerators and denominators, which avoids creating any intermediate Fractions.
+
+    Parameters
+    ----------
+    value : Union[int, Fraction]
+        The value to check, for example a beat position in whole notes.
+    length : Fraction
+        The (positive) length to check against, for example a beat length in whole notes.
+
+    Returns
+    -------
+    is_multiple : bool
+        True if value is an integer multiple of length. False otherwise.
+    """
+    try:
+        numerator, denominator = value.numerator, value.denominator
+    except AttributeError:
+        return value % length == 0
 
-    if beat % measure_length == 0:
-        return 3
-    if beat % beat_length == 0:
-        return 2
-    if beat % sub_beat_length == 0:
-        return 1
-    return 0
+    return (numerator * length.denominator) % (denominator * length.numerator) == 0
@@ -0,0 +1,111 @@
+"""Shared pytest fixtures for the tests"""
+from fractions import Fraction
+
+import pandas as pd
+import pytest
+
+import harmonic_inference.utils.corpus_utils as cu
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--runslow", action="store_true", default=False, help="Also run tests marked as slow."
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+
+    skip_slow = pytest.mark.skip(reason="Slow test: use --runslow to run it.")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(scope="session")
+def measures():
+    measures_dicts = [
+        # No offsets
+        pd.DataFrame(
+            {
+                "mc": [1, 2, 3, 4, 5, 6, 7],
+                "act_dur": [
+                    Fraction(1),
+                    Fraction(1),
+                    Fraction(1, 2),
+                    Fraction(1),
+                    Fraction(1, 2),
+                    Fraction(1),
+                    Fraction(1, 2),
+                ],
+                "offset": [Fraction(0)] * 7,
+                "extra": 0,
+                "next": [(1, 2), (3,), (4,), (5, 6), (6,), (7,), (1, 2, 3, -1)],
+            }
+        ),
+        # Offsets
+        pd.DataFrame(
+            {
+                "mc": [1, 2, 3, 4, 5, 6, 7],
+                "act_dur": [
+                    Fraction(1, 2),
+                    Fraction(1, 2),
+                    Fraction(1, 4),
+                    Fraction(1, 2),
+                    Fraction(1, 4),
+                    Fraction(1),
+                    Fraction(1, 4),
+                ],
+                "offset": [
+                    Fraction(1, 2),
+                    Fraction(1, 2),
+                    Fraction(1, 4),
+                    Fraction(1, 2),
+                    Fraction(1, 4),
+                    Fraction(0),
+                    Fraction(1, 4),
+                ],
+                "extra": 0,
+                "next": [(1, 2), (3,), (4,), (6, 5), (6,), (7,), (1, 2, -1, 3)],
+            }
+        ),
+        pd.DataFrame(
+            {  # Alternate offsets
+                "mc": [1, 2, 3, 4, 5, 6, 7],
+                "act_dur": [
+                    Fraction(1),
+                    Fraction(1),
+                    Fraction(1, 2),
+                    Fraction(1),
+                    Fraction(1, 2),
+                    Fraction(1),
+                    Fraction(1, 2),
+                ],
+                "offset": [
+                    Fraction(0),
+                    Fraction(1, 2),
+                    Fraction(1, 4),
+                    Fraction(1, 2),
+                    Fraction(1, 4),
+                    Fraction(0),
+                    Fraction(1, 2),
+                ],
+                "extra": 0,
+                "next": [(1, 2, 3), (3,), (4,), (2, 5, 6), (2, 6), (7,), (1, 2, 3, -1)],
+            }
+        ),
+    ]
+    measures = pd.concat(measures_dicts, keys=[0, 1, 2], axis=0, names=["file_id", "measure_id"])
+    measures.mc = measures.mc.astype("Int64")
+    return measures
+
+
+@pytest.fixture(scope="session")
+def removed_repeats(measures):
+    return cu.remove_repeats(measures, remove_unreachable=True)
+
+
+@pytest.fixture(scope="session")
+def removed_repeats_with_unreachable(measures):
+    return cu.remove_repeats(measures, remove_unreachable=False)
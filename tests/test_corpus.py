@@ -1,10 +1,15 @@
 """Tests for corpus_data structure"""
 from pathlib import Path
+import hashlib
+import inspect
 import logging
 
 from tqdm import tqdm
 import pandas as pd
+import pytest
 
+import harmonic_inference.data.corpus_constants as corpus_constants
+import harmonic_inference.data.corpus_reading as corpus_reading
 import harmonic_inference.utils.corpus_utils as cu
 from harmonic_inference.data.corpus_reading import read_dump, load_clean_corpus_dfs
 
@@ -14,6 +19,9 @@ CHORDS_TSV = TSV_BASE / 'chords.tsv'
 NOTES_TSV = TSV_BASE / 'notes.tsv'
 MEASURES_TSV = TSV_BASE / 'measures.tsv'
 
+# Every test here reads the full corpus tsvs, and each builds on the previous test's results
+pytestmark = pytest.mark.slow
+
 files_dfs = {
     'default': None
 }
@@ -38,14 +46,59 @@ notes_dfs = {
 }
 
 
-def test_files():
+@pytest.fixture(scope="session")
+def corpus_cache_dir(request, tmp_path_factory) -> Path:
+    """
+    The directory in which parsed corpus tsvs are cached: pytest's own cache directory, or a
+    temporary directory for this session if the cacheprovider plugin is disabled.
+    """
+    cache = getattr(request.config, "cache", None)
+    if cache is None:
+        return tmp_path_factory.mktemp("corpus")
+    return Path(cache.makedir("corpus"))
+
+
+def read_dump_cached(file: Path, cache_dir: Path, **kwargs) -> pd.DataFrame:
+    """
+    Read a corpus tsv with read_dump, caching the parsed DataFrame as a pickle in cache_dir.
+
+    The cache is keyed by the tsv's path, modification time, and size, the read_dump kwargs,
+    the pandas version, and the source of the corpus reading code (read_dump and the converters
+    and dtypes it uses), so it is refreshed whenever either the tsv or its parsing changes.
+    Only the raw parse is cached: the corpus_utils functions under test are always re-run.
+    """
+    tsv_stat = file.stat()
+    key = hashlib.sha1(
+        repr(
+            (
+                str(file.resolve()),
+                tsv_stat.st_mtime_ns,
+                tsv_stat.st_size,
+                sorted(kwargs.items()),
+                pd.__version__,
+                inspect.getsource(corpus_reading),
+                inspect.getsource(corpus_constants),
+            )
+        ).encode()
+    ).hexdigest()
+
+    cache_path = cache_dir / f'{key}.pkl'
+    if cache_path.exists():
+        return pd.read_pickle(cache_path)
+
+    df = read_dump(file, **kwargs)
+    df.to_pickle(cache_path)
+    return df
+
+
+def test_files(corpus_cache_dir):
     global files_dfs, measures_dfs, chords_dfs, notes_dfs
-    files_dfs['default'] = read_dump(FILES_TSV, index_col=0)
+    files_dfs['default'] = read_dump_cached(FILES_TSV, corpus_cache_dir, index_col=0)
 
 
-def test_measures():
+def test_measures(corpus_cache_dir):
     global files_dfs, measures_dfs, chords_dfs, notes_dfs
-    measures_dfs['default'] = read_dump(MEASURES_TSV)
+    measures_dfs['default'] = read_dump_cached(MEASURES_TSV, corpus_cache_dir)
     measures_dfs['removed'] = cu.remove_repeats(measures_dfs['default'], remove_unreachable=True)
 
     for df in measures_dfs.values():
@@ -53,36 +106,49 @@ def test_measures():
 
     # Well-formedness
     for file_id, piece_df in tqdm(
-        measures_dfs['removed'].groupby('file_id'),
+        measures_dfs['removed'].groupby('file_id', sort=False),
         desc="Checking measures well-formedness",
     ):
-        piece_df = piece_df.copy()
+        # piece_df is only read, so the group is used directly rather than copied
+        mcs = piece_df.mc
+        next_mcs = piece_df.next
+        start_mc = mcs.iloc[0]
 
-        assert len(piece_df.loc[piece_df['next'].isnull()]) == 1, "Not exactly 1 mc ends."
+        assert next_mcs.isnull().sum() == 1, "Not exactly 1 mc ends."
 
         # Check that every measure can be reached at most once
-        assert piece_df.next.value_counts().max() == 1
+        assert next_mcs.value_counts().max() == 1
 
         # Check that every measure can be reached except the start_mc
-        assert set(piece_df.mc) - set(piece_df.next) == set([piece_df.iloc[0].mc])
+        assert set(mcs) - set(next_mcs) == set([start_mc])
 
         # Check that every measure points forwards (ensures no disjoint loops)
-        assert len(piece_df.loc[piece_df.next <= piece_df.mc]) == 0
+        assert not (next_mcs <= mcs).any()
+
+        # Check that every measure is reached by following the next pointers from the start_mc.
+        # This walks a prebuilt mc -> next dict iteratively, rather than scanning piece_df.
+        next_mc_dict = dict(zip(mcs, next_mcs))
+        reached_mcs = set()
+        mc = start_mc
+        while not pd.isna(mc) and mc not in reached_mcs:
+            reached_mcs.add(mc)
+            mc = next_mc_dict.get(mc)
+        assert reached_mcs == set(mcs)
 
 
-def test_chords():
+def test_chords(corpus_cache_dir):
     global files_dfs, measures_dfs, chords_dfs, notes_dfs
-    chords_dfs['default'] = read_dump(CHORDS_TSV, low_memory=False)
+    chords_dfs['default'] = read_dump_cached(CHORDS_TSV, corpus_cache_dir, low_memory=False)
     chords_dfs['removed'] = cu.remove_unmatched(chords_dfs['default'], measures_dfs['removed'])
     chords_dfs['dropped'] = chords_dfs['removed'].drop(
         chords_dfs['removed'].loc[(chords_dfs['removed'].numeral == '@none') |
                                   chords_dfs['removed'].numeral.isnull()].index
     )
 
-    # Check for invalid onset times
+    # Check for invalid onset times. Only the columns needed for the check are merged.
     chord_measures = pd.merge(
-        chords_dfs['dropped'].reset_index(),
-        measures_dfs['removed'].reset_index(),
+        chords_dfs['dropped'].reset_index().loc[:, ['file_id', 'chord_id', 'mc', 'onset']],
+        measures_dfs['removed'].reset_index().loc[:, ['file_id', 'mc', 'offset', 'act_dur']],
         how='left',
         on=['file_id', 'mc'],
     )
@@ -129,16 +195,16 @@ def test_chords():
     assert all(chords_dfs['offsets'].mc_next.isin(measures_dfs['removed'].mc))
 
 
-def test_notes():
+def test_notes(corpus_cache_dir):
     global files_dfs, measures_dfs, chords_dfs, notes_dfs
-    notes_dfs['default'] = read_dump(NOTES_TSV)
+    notes_dfs['default'] = read_dump_cached(NOTES_TSV, corpus_cache_dir)
     notes_dfs['removed'] = cu.remove_unmatched(notes_dfs['default'], measures_dfs['removed'])
     notes_dfs['offsets'] = cu.add_note_offsets(notes_dfs['removed'], measures_dfs['removed'])
 
-    # Check for invalid onset times
+    # Check for invalid onset times. Only the columns needed for the check are merged.
     note_measures = pd.merge(
-        notes_dfs['offsets'].reset_index(),
-        measures_dfs['removed'].reset_index(),
+        notes_dfs['offsets'].reset_index().loc[:, ['file_id', 'note_id', 'mc', 'onset']],
+        measures_dfs['removed'].reset_index().loc[:, ['file_id', 'mc', 'offset', 'act_dur']],
         how='left',
         on=['file_id', 'mc'],
     )
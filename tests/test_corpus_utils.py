@@ -1,83 +1,23 @@
 """Tests for corpus_utils.py"""
 from fractions import Fraction
 
+import numpy as np
 import pandas as pd
+from pandas.testing import assert_frame_equal, assert_index_equal
 
 import harmonic_inference.utils.corpus_utils as cu
 import harmonic_inference.utils.rhythmic_utils as ru
 
 
-measures_dicts = [
-    # No offsets
-    pd.DataFrame({
-        'mc': [1, 2, 3, 4, 5, 6, 7],
-        'act_dur': [Fraction(1),
-                    Fraction(1),
-                    Fraction(1, 2),
-                    Fraction(1),
-                    Fraction(1, 2),
-                    Fraction(1),
-                    Fraction(1, 2)],
-        'offset': [Fraction(0)] * 7,
-        'extra': 0,
-        'next': [(1, 2), (3,), (4,), (5, 6), (6, ), (7, ), (1, 2, 3, -1)]
-    }),
-    # Offsets
-    pd.DataFrame({
-        'mc': [1, 2, 3, 4, 5, 6, 7],
-        'act_dur': [Fraction(1, 2),
-                    Fraction(1, 2),
-                    Fraction(1, 4),
-                    Fraction(1, 2),
-                    Fraction(1, 4),
-                    Fraction(1),
-                    Fraction(1, 4)],
-        'offset': [Fraction(1, 2),
-                   Fraction(1, 2),
-                   Fraction(1, 4),
-                   Fraction(1, 2),
-                   Fraction(1, 4),
-                   Fraction(0),
-                   Fraction(1, 4)],
-        'extra': 0,
-        'next': [(1, 2), (3,), (4,), (6, 5), (6, ), (7, ), (1, 2, -1, 3)]
-    }),
-    pd.DataFrame({  # Alternate offsets
-        'mc': [1, 2, 3, 4, 5, 6, 7],
-        'act_dur': [Fraction(1),
-                    Fraction(1),
-                    Fraction(1, 2),
-                    Fraction(1),
-                    Fraction(1, 2),
-                    Fraction(1),
-                    Fraction(1, 2)],
-        'offset': [Fraction(0),
-                   Fraction(1, 2),
-                   Fraction(1, 4),
-                   Fraction(1, 2),
-                   Fraction(1, 4),
-                   Fraction(0),
-                   Fraction(1, 2)],
-        'extra': 0,
-        'next': [(1, 2, 3), (3,), (4,), (2, 5, 6), (2, 6), (7, ), (1, 2, 3, -1)]
-    })
-]
-measures = pd.concat(
-    measures_dicts, keys=[0, 1, 2], axis=0, names=['file_id', 'measure_id']
-)
-measures.mc = measures.mc.astype('Int64')
-
-removed_repeats = cu.remove_repeats(measures, remove_unreachable=True)
-removed_repeats_with_unreachable = cu.remove_repeats(measures, remove_unreachable=False)
-
-
-def test_remove_repeats():
+def test_remove_repeats(measures, removed_repeats, removed_repeats_with_unreachable):
     # Test well-formedness
     assert removed_repeats.next.dtype == 'Int64'
-    assert all(measures.columns == removed_repeats.columns)
+    assert_index_equal(measures.columns, removed_repeats.columns)
     assert measures.index.name == removed_repeats.index.name
     columns = list(set(measures.columns) - set(['next']))
-    assert measures.loc[removed_repeats.index, columns].equals(removed_repeats.loc[:, columns])
+    assert_frame_equal(
+        measures.loc[removed_repeats.index, columns], removed_repeats.loc[:, columns]
+    )
 
     # Check accuracy
     assert list(removed_repeats.next.to_numpy()) == [
@@ -86,11 +26,12 @@ def test_remove_repeats():
 
     # Tests with removed_repeats_with_unreachable
     assert removed_repeats_with_unreachable.next.dtype == 'Int64'
-    assert all(measures.columns == removed_repeats_with_unreachable.columns)
+    assert_index_equal(measures.columns, removed_repeats_with_unreachable.columns)
     assert measures.index.name == removed_repeats_with_unreachable.index.name
     columns = list(set(measures.columns) - set(['next']))
-    assert measures.loc[removed_repeats_with_unreachable.index, columns].equals(
-        removed_repeats_with_unreachable.loc[:, columns]
+    assert_frame_equal(
+        measures.loc[removed_repeats_with_unreachable.index, columns],
+        removed_repeats_with_unreachable.loc[:, columns],
     )
 
     # Check accuracy
@@ -99,7 +40,7 @@ def test_remove_repeats():
     ]
 
 
-def test_remove_unmatched():
+def test_remove_unmatched(removed_repeats, removed_repeats_with_unreachable):
     for id_name in ['chord_id', 'note_id']:
         df = pd.DataFrame({
             'file_id': [0, 0, 2, 2, 2],
@@ -109,7 +50,7 @@ def test_remove_unmatched():
         }).set_index(['file_id', id_name])
 
         df_matched = cu.remove_unmatched(df, removed_repeats)
-        assert df_matched.equals(pd.DataFrame({
+        assert_frame_equal(df_matched, pd.DataFrame({
             'file_id': [0, 2],
             id_name: [0, 1],
             'mc': [1, 3],
@@ -117,7 +58,7 @@ def test_remove_unmatched():
         }).set_index(['file_id', id_name]))
 
         df_matched = cu.remove_unmatched(df, removed_repeats_with_unreachable)
-        assert df_matched.equals(pd.DataFrame({
+        assert_frame_equal(df_matched, pd.DataFrame({
             'file_id': [0, 0, 2, 2],
             id_name: [0, 1, 0, 1],
             'mc': [1, 5, 2, 3],
@@ -125,7 +66,7 @@ def test_remove_unmatched():
         }).set_index(['file_id', id_name]))
 
 
-def test_add_chord_metrical_data():
+def test_add_chord_metrical_data(removed_repeats_with_unreachable):
     chords = pd.DataFrame({
         'file_id': [0, 0, 0, 2, 2, 2],
         'onset': [Fraction(1, 2),
@@ -145,7 +86,7 @@ def test_add_chord_metrical_data():
     assert offsets_chords_df.mc_next.dtype == 'Int64'
     assert isinstance(offsets_chords_df.onset_next.values[0], Fraction)
     assert isinstance(offsets_chords_df.duration.values[0], Fraction)
-    assert all(offsets_chords_df.index == chords.index)
+    assert_index_equal(offsets_chords_df.index, chords.index)
     assert set(offsets_chords_df.columns) - set(chords.columns) == set(['mc_next', 'onset_next',
                                                                         'duration'])
     assert len(set(chords.columns) - set(offsets_chords_df.columns)) == 0
@@ -153,7 +94,7 @@ def test_add_chord_metrical_data():
     assert len(offsets_chords_df.loc[offsets_chords_df.onset_next.isnull()]) == 0
 
     # Check accuracy
-    assert offsets_chords_df.loc[:, chords.columns].equals(chords)
+    assert_frame_equal(offsets_chords_df.loc[:, chords.columns], chords)
     assert list(offsets_chords_df.duration.to_numpy()) == [Fraction(1, 4),
                                                            Fraction(1, 4),
                                                            Fraction(4),
@@ -169,150 +110,75 @@ def test_add_chord_metrical_data():
                                                              Fraction(1)]
 
 
-def test_add_note_offsets():
-    def check_result(note: pd.DataFrame, target_offset_mc: int, target_offset_beat: Fraction):
-        """
-        Check the result of a call to cu.add_note_offsets with assertions.
-
-        Parameters
-        ----------
-        note : pd.DataFrame
-            A DataFrame with a single note, to be passed to add_note_offsets.
-        target_offset_mc : int
-            The correct offset_mc for the note.
-        target_offset_beat : Fraction
-            The correct offset_beat for the note.
-        """
-        note_offset = cu.add_note_offsets(note, removed_repeats)
-
-        # Check well-formedness, structure, size, etc
-        assert note_offset.offset_mc.dtype == 'Int64'
-        assert isinstance(note_offset.offset_beat.values[0], Fraction)
-        assert all(note_offset.index == note.index)
-        assert set(note_offset.columns) - set(note.columns) == set(['offset_beat',
-                                                                    'offset_mc'])
-        assert len(set(note.columns) - set(note_offset.columns)) == 0
-        assert len(note_offset.loc[note_offset.offset_mc.isnull()]) == 0
-        assert len(note_offset.loc[note_offset.offset_beat.isnull()]) == 0
-
-        # Check values
-        assert note.equals(note_offset.loc[:, ['mc', 'onset', 'duration']])
-        assert target_offset_mc == note_offset.offset_mc.values[0]
-        assert target_offset_beat == note_offset.offset_beat.values[0]
-
-        # Check with rhythmic utils
-        assert ru.get_range_length(
-            (note.mc.values[0], note.onset.values[0]), (target_offset_mc, target_offset_beat),
-            removed_repeats.loc[note.index.get_level_values('file_id')]
-        ) == note.duration.values[0]
-
-        # Check types
-        assert isinstance(note_offset.offset_beat.values[0], Fraction)
-        assert note_offset.offset_mc.dtype == 'Int64'
-        assert note_offset.offset_beat.dtype == Fraction
-
-        # Check structure of result
-        assert set(note_offset.columns) == set(
-            ['mc', 'onset', 'duration', 'offset_mc', 'offset_beat']
-        )
-        assert note_offset.index.names == ['file_id', 'note_id']
-        assert len(note_offset) == len(note)
-
-    # Tests without offset
-    # In same measure
-    note = pd.DataFrame({
-        'file_id': [0],
-        'note_id': [0],
-        'mc': [1],
-        'onset': [Fraction(0)],
-        'duration': [Fraction(3, 4)]
-    }).set_index(['file_id', 'note_id'])
-    target_offset_mc = 1
-    target_offset_beat = Fraction(3, 4)
-
-    check_result(note, target_offset_mc, target_offset_beat)
-
-    # One measure long
-    note = pd.DataFrame({
-        'file_id': [0],
-        'note_id': [0],
-        'mc': [1],
-        'onset': [Fraction(3, 4)],
-        'duration': [Fraction(1, 4)]
-    }).set_index(['file_id', 'note_id'])
-    target_offset_mc = 2
-    target_offset_beat = Fraction(0)
-
-    check_result(note, target_offset_mc, target_offset_beat)
-
-    # Multiple measures
-    note = pd.DataFrame({
-        'file_id': [0],
-        'note_id': [0],
-        'mc': [1],
-        'onset': [Fraction(0)],
-        'duration': [Fraction(20)]
-    }).set_index(['file_id', 'note_id'])
-    target_offset_mc = 7
-    target_offset_beat = Fraction(31, 2)
-
-    check_result(note, target_offset_mc, target_offset_beat)
-
-    # Tests with offsets
-    # In same measure
-    note = pd.DataFrame({
-        'file_id': [1],
-        'note_id': [0],
-        'mc': [1],
-        'onset': [Fraction(1, 2)],
-        'duration': [Fraction(1, 4)]
-    }).set_index(['file_id', 'note_id'])
-    target_offset_mc = 1
-    target_offset_beat = Fraction(3, 4)
-
-    check_result(note, target_offset_mc, target_offset_beat)
-
-    # One measure long
-    note = pd.DataFrame({
-        'file_id': [1],
-        'note_id': [0],
-        'mc': [1],
-        'onset': [Fraction(1, 2)],
-        'duration': [Fraction(1, 2)]
-    }).set_index(['file_id', 'note_id'])
-    target_offset_mc = 2
-    target_offset_beat = Fraction(1, 2)
-
-    check_result(note, target_offset_mc, target_offset_beat)
-
-    # One+ measure
-    note = pd.DataFrame({
-        'file_id': [1],
-        'note_id': [0],
-        'mc': [1],
-        'onset': [Fraction(1, 2)],
-        'duration': [Fraction(3, 4)]
-    }).set_index(['file_id', 'note_id'])
-    target_offset_mc = 2
-    target_offset_beat = Fraction(3, 4)
-
-    check_result(note, target_offset_mc, target_offset_beat)
-
-    # Many measures
-    note = pd.DataFrame({
-        'file_id': [1],
-        'note_id': [0],
-        'mc': [1],
-        'onset': [Fraction(1, 2)],
-        'duration': [Fraction(20)]
+def test_add_note_offsets(removed_repeats):
+    # All notes are checked with a single call to add_note_offsets. In order:
+    # Without offset: in same measure, one measure long, multiple measures
+    # With offsets: in same measure, one measure long, one+ measure, many measures
+    notes = pd.DataFrame({
+        'file_id': [0, 0, 0, 1, 1, 1, 1],
+        'note_id': [0, 1, 2, 0, 1, 2, 3],
+        'mc': [1, 1, 1, 1, 1, 1, 1],
+        'onset': [Fraction(0),
+                  Fraction(3, 4),
+                  Fraction(0),
+                  Fraction(1, 2),
+                  Fraction(1, 2),
+                  Fraction(1, 2),
+                  Fraction(1, 2)],
+        'duration': [Fraction(3, 4),
+                     Fraction(1, 4),
+                     Fraction(20),
+                     Fraction(1, 4),
+                     Fraction(1, 2),
+                     Fraction(3, 4),
+                     Fraction(20)]
     }).set_index(['file_id', 'note_id'])
-    target_offset_mc = 7
-    target_offset_beat = Fraction(35, 2)
+    target_offset_mcs = [1, 2, 7, 1, 2, 2, 7]
+    target_offset_beats = [Fraction(3, 4),
+                           Fraction(0),
+                           Fraction(31, 2),
+                           Fraction(3, 4),
+                           Fraction(1, 2),
+                           Fraction(3, 4),
+                           Fraction(35, 2)]
+
+    notes_offset = cu.add_note_offsets(notes, removed_repeats)
+
+    # Check well-formedness, structure, size, etc
+    assert notes_offset.offset_mc.dtype == 'Int64'
+    assert_index_equal(notes_offset.index, notes.index)
+    assert set(notes_offset.columns) - set(notes.columns) == set(['offset_beat', 'offset_mc'])
+    assert len(set(notes.columns) - set(notes_offset.columns)) == 0
+    assert len(notes_offset.loc[notes_offset.offset_mc.isnull()]) == 0
+    assert len(notes_offset.loc[notes_offset.offset_beat.isnull()]) == 0
+
+    # Check values
+    assert_frame_equal(notes, notes_offset.loc[:, ['mc', 'onset', 'duration']])
+    assert list(notes_offset.offset_mc) == target_offset_mcs
+    assert list(notes_offset.offset_beat) == target_offset_beats
+
+    # Check with rhythmic utils
+    for note, target_offset_mc, target_offset_beat in zip(
+        notes.itertuples(), target_offset_mcs, target_offset_beats
+    ):
+        assert ru.get_range_length(
+            (note.mc, note.onset), (target_offset_mc, target_offset_beat),
+            removed_repeats.loc[[note.Index[0]]]
+        ) == note.duration
+
+    # Check types
+    assert all(isinstance(offset_beat, Fraction) for offset_beat in notes_offset.offset_beat)
+    assert notes_offset.offset_beat.dtype == Fraction
 
-    check_result(note, target_offset_mc, target_offset_beat)
+    # Check structure of result
+    assert set(notes_offset.columns) == set(
+        ['mc', 'onset', 'duration', 'offset_mc', 'offset_beat']
+    )
+    assert notes_offset.index.names == ['file_id', 'note_id']
+    assert len(notes_offset) == len(notes)
 
 
-def test_get_notes_during_chord():
+def test_get_notes_during_chord(removed_repeats_with_unreachable):
     chords = pd.DataFrame({
         'file_id': [0, 0, 1, 2, 2],
         'onset': [Fraction(3, 4),
@@ -363,12 +229,14 @@ def test_get_notes_during_chord():
         notes = cu.get_notes_during_chord(chord, offsets_notes_df)
 
         notes_onsets = cu.get_notes_during_chord(chord, offsets_notes_df, onsets_only=True)
-        assert notes_onsets.equals(notes.loc[notes.overlap.isin([pd.NA, 1])])
+        assert_frame_equal(notes_onsets, notes.loc[notes.overlap.isin([pd.NA, 1])])
 
         assert set(notes.columns) == set(list(offsets_notes_df.columns) + ['overlap'])
         assert notes.index.names == offsets_notes_df.index.names
         if len(notes) > 0:
-            assert notes.loc[:, offsets_notes_df.columns].equals(offsets_notes_df.loc[notes.index])
+            assert_frame_equal(
+                notes.loc[:, offsets_notes_df.columns], offsets_notes_df.loc[notes.index]
+            )
         assert notes.overlap.dtype == 'Int64'
         assert len(notes) == 4
         assert list(notes.overlap) == [-1, 0, pd.NA, 1]
@@ -490,18 +358,22 @@ def test_merge_ties():
         assert len(set(notes.columns) - set(merged.columns)) == 0
 
         unchanged = list(set(notes.columns) - set(['offset_mc', 'offset_beat', 'duration', 'tied']))
-        assert notes.loc[merged.index, unchanged].equals(merged.loc[:, unchanged])
+        assert_frame_equal(notes.loc[merged.index, unchanged], merged.loc[:, unchanged])
 
         # Now, check accuracy
         assert 0 in merged.index.get_level_values(0)
         merged_single = merged.loc[0]
         assert len(merged_single) == 5
-        assert all(merged_single.index == [0, 4, 7, 8, 10])
-        assert all(merged_single.offset_mc == [6, 5, 6, 9, 8])
-        assert all(merged_single.offset_beat == [0, 0, Fraction(1, 2), 0, 0])
-        assert all(merged_single.duration == [Fraction(5), Fraction(1), Fraction(1, 2), 1, 0])
+        assert np.array_equal(merged_single.index, [0, 4, 7, 8, 10])
+        assert np.array_equal(merged_single.offset_mc, [6, 5, 6, 9, 8])
+        assert np.array_equal(merged_single.offset_beat, [0, 0, Fraction(1, 2), 0, 0])
+        assert np.array_equal(
+            merged_single.duration, [Fraction(5), Fraction(1), Fraction(1, 2), 1, 0]
+        )
         # Fix for pd.NA == pd.NA returns False
-        assert all(merged_single.tied.fillna(NA) == [finished_tie, -1, NA, unfinished_tie, -1])
+        assert np.array_equal(
+            merged_single.tied.fillna(NA), [finished_tie, -1, NA, unfinished_tie, -1]
+        )
 
         # Now, check accuracy
         assert 1 in merged.index.get_level_values(0)
@@ -512,12 +384,13 @@ def test_merge_ties():
         index_set = set(merged_single.index) - set(always_in)
         assert sum(i in index_set for i in sometimes_in) == 2
         assert len(set(always_in) - set(merged_single.index)) == 0
-        assert all(merged_single.offset_mc == [2, 2, 2, 2, 3, 3, 4, 5, 6])
-        assert all(merged_single.offset_beat == [0, 0, 0, 0, 0, 0, 0, 0, 0])
-        assert all(merged_single.duration == [2, 1, 1, 1, 1, Fraction(1, 2), 1, 1, 1])
+        assert np.array_equal(merged_single.offset_mc, [2, 2, 2, 2, 3, 3, 4, 5, 6])
+        assert np.array_equal(merged_single.offset_beat, [0, 0, 0, 0, 0, 0, 0, 0, 0])
+        assert np.array_equal(merged_single.duration, [2, 1, 1, 1, 1, Fraction(1, 2), 1, 1, 1])
         # Fix for pd.NA == pd.NA returns False
-        assert all(merged_single.tied.fillna(NA) == [finished_tie, -1, -1, unfinished_tie, -1,
-                                                     unfinished_tie, -1, unfinished_tie, -1])
+        assert np.array_equal(merged_single.tied.fillna(NA), [finished_tie, -1, -1, unfinished_tie,
+                                                              -1, unfinished_tie, -1,
+                                                              unfinished_tie, -1])
 
         # Now, check accuracy
         assert 2 in merged.index.get_level_values(0)
@@ -529,14 +402,17 @@ def test_merge_ties():
         assert sum(i in index_set for i in sometimes_in) == 2
         assert len(set(always_in) - set(merged_single.index)) == 0
         assert (
-            all(merged_single.offset_mc == [4, 4, 2]) or
-            all(merged_single.offset_mc == [4, 2, 4])
+            np.array_equal(merged_single.offset_mc, [4, 4, 2]) or
+            np.array_equal(merged_single.offset_mc, [4, 2, 4])
+        )
+        assert np.array_equal(merged_single.offset_beat, [0, 0, 0])
+        assert (
+            np.array_equal(merged_single.duration, [4, 3, 1]) or
+            np.array_equal(merged_single.duration, [4, 1, 3])
         )
-        assert all(merged_single.offset_beat == [0, 0, 0])
-        assert all(merged_single.duration == [4, 3, 1]) or all(merged_single.duration == [4, 1, 3])
         # Fix for pd.NA == pd.NA returns False
-        assert (all(merged_single.tied.fillna(NA) == [finished_tie, -1, 0]) or
-                all(merged_single.tied.fillna(NA) == [finished_tie, 0, -1]))
+        assert (np.array_equal(merged_single.tied.fillna(NA), [finished_tie, -1, 0]) or
+                np.array_equal(merged_single.tied.fillna(NA), [finished_tie, 0, -1]))
         # Ensure the orderings for the variable fields are consistent
         total = 0
         for i in 1, 2:
@@ -549,31 +425,31 @@ def test_merge_ties():
         assert 3 in merged.index.get_level_values(0)
         merged_single = merged.loc[3]
         assert len(merged_single) == 6
-        assert all(merged_single.index == [0, 1, 3, 4, 6, 7])
-        offset_mc_match = [all(merged_single.offset_mc == [2, 1, 3, 4, 5, 6]),
-                           all(merged_single.offset_mc == [1, 2, 3, 4, 5, 6]),
-                           all(merged_single.offset_mc == [1, 2, 4, 3, 5, 6]),
-                           all(merged_single.offset_mc == [2, 1, 4, 3, 5, 6])]
+        assert np.array_equal(merged_single.index, [0, 1, 3, 4, 6, 7])
+        offset_mc_match = [np.array_equal(merged_single.offset_mc, [2, 1, 3, 4, 5, 6]),
+                           np.array_equal(merged_single.offset_mc, [1, 2, 3, 4, 5, 6]),
+                           np.array_equal(merged_single.offset_mc, [1, 2, 4, 3, 5, 6]),
+                           np.array_equal(merged_single.offset_mc, [2, 1, 4, 3, 5, 6])]
         assert sum(offset_mc_match) == 1
-        assert all(merged_single.offset_beat == [0, 0, 0, 0, 0, 0])
-        duration_match = [all(merged_single.duration == [4, 2, 2, 4, 2, 4]),
-                          all(merged_single.duration == [2, 4, 2, 4, 2, 4]),
-                          all(merged_single.duration == [2, 4, 4, 2, 2, 4]),
-                          all(merged_single.duration == [4, 2, 4, 2, 2, 4])]
+        assert np.array_equal(merged_single.offset_beat, [0, 0, 0, 0, 0, 0])
+        duration_match = [np.array_equal(merged_single.duration, [4, 2, 2, 4, 2, 4]),
+                          np.array_equal(merged_single.duration, [2, 4, 2, 4, 2, 4]),
+                          np.array_equal(merged_single.duration, [2, 4, 4, 2, 2, 4]),
+                          np.array_equal(merged_single.duration, [4, 2, 4, 2, 2, 4])]
         assert sum(duration_match) == 1
         # Fix for pd.NA == pd.NA returns False
-        tied_match = [all(merged_single.tied.fillna(NA) == [finished_tie, unfinished_tie,
-                                                            unfinished_tie, finished_tie,
-                                                            unfinished_tie, finished_tie]),
-                      all(merged_single.tied.fillna(NA) == [unfinished_tie, finished_tie,
-                                                            unfinished_tie, finished_tie,
-                                                            unfinished_tie, finished_tie]),
-                      all(merged_single.tied.fillna(NA) == [unfinished_tie, finished_tie,
-                                                            finished_tie, unfinished_tie,
-                                                            unfinished_tie, finished_tie]),
-                      all(merged_single.tied.fillna(NA) == [finished_tie, unfinished_tie,
-                                                            finished_tie, unfinished_tie,
-                                                            unfinished_tie, finished_tie])]
+        tied_match = [np.array_equal(merged_single.tied.fillna(NA), [finished_tie, unfinished_tie,
+                                                                     unfinished_tie, finished_tie,
+                                                                     unfinished_tie, finished_tie]),
+                      np.array_equal(merged_single.tied.fillna(NA), [unfinished_tie, finished_tie,
+                                                                     unfinished_tie, finished_tie,
+                                                                     unfinished_tie, finished_tie]),
+                      np.array_equal(merged_single.tied.fillna(NA), [unfinished_tie, finished_tie,
+                                                                     finished_tie, unfinished_tie,
+                                                                     unfinished_tie, finished_tie]),
+                      np.array_equal(merged_single.tied.fillna(NA), [finished_tie, unfinished_tie,
+                                                                     finished_tie, unfinished_tie,
+                                                                     unfinished_tie, finished_tie])]
         assert sum(tied_match) == 1
         # Ensure the orderings for the variable fields are consistent
         assert offset_mc_match.index(True) == duration_match.index(True)
@@ -1,6 +1,8 @@
 """Tests for harmonic_utils.py"""
 import itertools
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -8,58 +10,49 @@ import harmonic_inference.utils.harmonic_constants as hc
 import harmonic_inference.utils.harmonic_utils as hu
 from harmonic_inference.data.data_types import ChordType, KeyMode, PitchType
 
+ACCIDENTALS = list(zip(["bbb", "bb", "b", "", "#", "##", "###"], [-3, -2, -1, 0, 1, 2, 3]))
+KEY_MODE_INTERVALS = [
+    (KeyMode.MAJOR, [0, 2, 4, 5, 7, 9, 11], [0, 2, 4, -1, 1, 3, 5]),
+    (KeyMode.MINOR, [0, 2, 3, 5, 7, 8, 10], [0, 2, -3, -1, 1, -4, -2]),
+]
 
-def test_get_accidental_adjustment():
-    for accidental, diff in zip(["#", "b"], [1, -1]):
-        for count in range(10):
-            for root in ["b", "B", "V", "1"]:
-                # Front
-                input_string = accidental * count + root
-                adj_out, out_string = hu.get_accidental_adjustment(input_string, in_front=True)
-
-                assert (
-                    adj_out == count * diff
-                ), f"Incorrect adjustment ({adj_out}) for input {input_string}"
-                assert (
-                    out_string == root
-                ), f"Incorrect string out ({out_string}) for input {input_string}"
 
-                # Back
+@pytest.mark.parametrize("accidental, diff", [("#", 1), ("b", -1)])
+@pytest.mark.parametrize("in_front", [True, False])
+def test_get_accidental_adjustment(accidental, diff, in_front):
+    for count in range(10):
+        for root in ["b", "B", "V", "1"]:
+            if in_front:
+                input_string = accidental * count + root
+            else:
                 input_string = root + accidental * count
-                adj_out, out_string = hu.get_accidental_adjustment(input_string, in_front=False)
+            adj_out, out_string = hu.get_accidental_adjustment(input_string, in_front=in_front)
 
-                assert (
-                    adj_out == count * diff
-                ), f"Incorrect adjustment ({adj_out}) for input {input_string}"
-                assert (
-                    out_string == root
-                ), f"Incorrect string out ({out_string}) for input {input_string}"
+            assert (
+                adj_out == count * diff
+            ), f"Incorrect adjustment ({adj_out}) for input {input_string}"
+            assert (
+                out_string == root
+            ), f"Incorrect string out ({out_string}) for input {input_string}"
 
 
-def test_transpose_chord_vector():
-    midi_vector = [0] * hc.NUM_PITCHES[PitchType.MIDI]
-    tpc_vector = [0] * hc.NUM_PITCHES[PitchType.TPC]
-    for idx in range(0, len(midi_vector), 2):
-        midi_vector[idx] = 1
-    for idx in range(0, len(tpc_vector), 3):
-        tpc_vector[idx] = 1
+@pytest.mark.parametrize("pitch_type, step", [(PitchType.MIDI, 2), (PitchType.TPC, 3)])
+def test_transpose_chord_vector(pitch_type, step):
+    num_pitches = hc.NUM_PITCHES[pitch_type]
+    chord_vector = np.zeros(num_pitches, dtype=int)
+    chord_vector[::step] = 1
 
     for interval in range(-50, 50):
-        midi_output = hu.transpose_chord_vector(midi_vector, interval, PitchType.MIDI)
-        tpc_output = hu.transpose_chord_vector(tpc_vector, interval, PitchType.TPC)
+        output = hu.transpose_chord_vector(chord_vector, interval, pitch_type)
 
-        for idx, val in enumerate(midi_vector):
-            assert midi_output[(idx + interval) % hc.NUM_PITCHES[PitchType.MIDI]] == val
+        target_indexes = np.arange(num_pitches) + interval
+        if pitch_type == PitchType.MIDI:
+            target_indexes %= num_pitches
+        valid = (0 <= target_indexes) & (target_indexes < num_pitches)
 
-        checked = []
-        for idx, val in enumerate(tpc_vector):
-            index = idx + interval
-            if 0 <= index < hc.NUM_PITCHES[PitchType.TPC]:
-                checked.append(index)
-                assert tpc_output[index] == val
-        for idx, val in enumerate(tpc_output):
-            if idx not in checked:
-                assert val == 0
+        correct = np.zeros(num_pitches, dtype=int)
+        correct[target_indexes[valid]] = chord_vector[valid]
+        assert np.array_equal(output, correct)
 
 
 def test_get_vector_from_chord_type():
@@ -105,85 +98,69 @@ def test_get_vector_from_chord_type():
         ["C", "E", "G#", "Bb"],
         ["C", "E", "G#", "B"],
     ]
+    # The same few pitch strings recur across chord types, so parse each only once
+    get_pitch_from_string = lru_cache(maxsize=None)(hu.get_pitch_from_string)
+
     for chord_type, midi_vector, tpc_vector in zip(
         chord_types, chord_vectors_midi, chord_vectors_tpc
     ):
         out_vector = hu.get_vector_from_chord_type(chord_type, PitchType.MIDI)
         assert out_vector.dtype == int
-        assert all(
-            midi_vector == out_vector
+        assert np.array_equal(
+            midi_vector, out_vector
         ), f"Chord vector incorrect for MIDI and chord type {chord_type}"
 
         out_vector_tpc = hu.get_vector_from_chord_type(chord_type, PitchType.TPC)
         assert out_vector_tpc.dtype == int
         tpc_vector_one_hot = [0] * hc.NUM_PITCHES[PitchType.TPC]
         for pitch_string in tpc_vector:
-            tpc_vector_one_hot[hu.get_pitch_from_string(pitch_string, PitchType.TPC)] = 1
-        assert all(
-            tpc_vector_one_hot == out_vector_tpc
+            tpc_vector_one_hot[get_pitch_from_string(pitch_string, PitchType.TPC)] = 1
+        assert np.array_equal(
+            tpc_vector_one_hot, out_vector_tpc
         ), f"Chord vector incorrect for TPC and chord type {chord_type}"
 
 
-def test_get_interval_from_numeral():
-    for acc, adj in zip(["bbb", "bb", "b", "", "#", "##", "###"], [-3, -2, -1, 0, 1, 2, 3]):
-        for key_mode, semitones, tpc in zip(
-            [KeyMode.MAJOR, KeyMode.MINOR],
-            [[0, 2, 4, 5, 7, 9, 11], [0, 2, 3, 5, 7, 8, 10]],
-            [[0, 2, 4, -1, 1, 3, 5], [0, 2, -3, -1, 1, -4, -2]],
-        ):
-            for numeral, index in zip(["I", "II", "III", "IV", "V", "VI", "VII"], range(7)):
-                numeral = acc + numeral
-                out_semis = hu.get_interval_from_numeral(numeral, key_mode, PitchType.MIDI)
-                assert (
-                    out_semis == semitones[index] + adj
-                ), f"Output semitones incorrect for inputs {(numeral, key_mode, PitchType.MIDI)}"
-                assert out_semis == hu.get_interval_from_numeral(numeral, key_mode, PitchType.MIDI)
-
-                out_tpc = hu.get_interval_from_numeral(numeral, key_mode, PitchType.TPC)
-                assert (
-                    out_tpc == tpc[index] + adj * hc.ACCIDENTAL_ADJUSTMENT[PitchType.TPC]
-                ), f"Output interval incorrect for inputs {(numeral, key_mode, PitchType.TPC)}"
-                assert out_tpc == hu.get_interval_from_numeral(numeral, key_mode, PitchType.TPC)
-
-
-def test_get_interval_from_scale_degree():
-    for acc, adj in zip(["bbb", "bb", "b", "", "#", "##", "###"], [-3, -2, -1, 0, 1, 2, 3]):
-        for key_mode, semitones, tpc in zip(
-            [KeyMode.MAJOR, KeyMode.MINOR],
-            [[0, 2, 4, 5, 7, 9, 11], [0, 2, 3, 5, 7, 8, 10]],
-            [[0, 2, 4, -1, 1, 3, 5], [0, 2, -3, -1, 1, -4, -2]],
-        ):
-            for numeral, number, index in zip(
-                ["I", "II", "III", "IV", "V", "VI", "VII"],
-                ["1", "2", "3", "4", "5", "6", "7"],
-                range(7),
-            ):
-                for prefixed, degree in itertools.product([True, False], [numeral, number]):
-                    if prefixed:
-                        degree = acc + degree
-                    else:
-                        degree = degree + acc
-                    out_semis = hu.get_interval_from_scale_degree(
-                        degree, prefixed, key_mode, PitchType.MIDI
-                    )
-                    assert out_semis == semitones[index] + adj, (
-                        "Output semitones incorrect for inputs "
-                        f"{(degree, key_mode, prefixed, PitchType.MIDI)}"
-                    )
-                    assert out_semis == hu.get_interval_from_scale_degree(
-                        degree, prefixed, key_mode, PitchType.MIDI
-                    )
+@pytest.mark.parametrize("acc, adj", ACCIDENTALS)
+@pytest.mark.parametrize("key_mode, semitones, tpc", KEY_MODE_INTERVALS)
+def test_get_interval_from_numeral(acc, adj, key_mode, semitones, tpc):
+    for numeral, index in zip(["I", "II", "III", "IV", "V", "VI", "VII"], range(7)):
+        numeral = acc + numeral
+        out_semis = hu.get_interval_from_numeral(numeral, key_mode, PitchType.MIDI)
+        assert (
+            out_semis == semitones[index] + adj
+        ), f"Output semitones incorrect for inputs {(numeral, key_mode, PitchType.MIDI)}"
+
+        out_tpc = hu.get_interval_from_numeral(numeral, key_mode, PitchType.TPC)
+        assert (
+            out_tpc == tpc[index] + adj * hc.ACCIDENTAL_ADJUSTMENT[PitchType.TPC]
+        ), f"Output interval incorrect for inputs {(numeral, key_mode, PitchType.TPC)}"
+
+
+@pytest.mark.parametrize("acc, adj", ACCIDENTALS)
+@pytest.mark.parametrize("key_mode, semitones, tpc", KEY_MODE_INTERVALS)
+@pytest.mark.parametrize("prefixed", [True, False])
+def test_get_interval_from_scale_degree(acc, adj, key_mode, semitones, tpc, prefixed):
+    for numeral, number, index in zip(
+        ["I", "II", "III", "IV", "V", "VI", "VII"],
+        ["1", "2", "3", "4", "5", "6", "7"],
+        range(7),
+    ):
+        for degree in numeral, number:
+            degree = acc + degree if prefixed else degree + acc
 
-                    out_tpc = hu.get_interval_from_scale_degree(
-                        degree, prefixed, key_mode, PitchType.TPC
-                    )
-                    assert out_tpc == tpc[index] + adj * hc.ACCIDENTAL_ADJUSTMENT[PitchType.TPC], (
-                        "Output interval incorrect for inputs "
-                        f"{(degree, prefixed, key_mode, PitchType.TPC)}"
-                    )
-                    assert out_tpc == hu.get_interval_from_scale_degree(
-                        degree, prefixed, key_mode, PitchType.TPC
-                    )
+            out_semis = hu.get_interval_from_scale_degree(
+                degree, prefixed, key_mode, PitchType.MIDI
+            )
+            assert out_semis == semitones[index] + adj, (
+                "Output semitones incorrect for inputs "
+                f"{(degree, key_mode, prefixed, PitchType.MIDI)}"
+            )
+
+            out_tpc = hu.get_interval_from_scale_degree(degree, prefixed, key_mode, PitchType.TPC)
+            assert out_tpc == tpc[index] + adj * hc.ACCIDENTAL_ADJUSTMENT[PitchType.TPC], (
+                "Output interval incorrect for inputs "
+                f"{(degree, prefixed, key_mode, PitchType.TPC)}"
+            )
 
 
 def test_tpc_interval_to_midi_interval():
@@ -194,22 +171,29 @@ def test_tpc_interval_to_midi_interval():
         assert hu.tpc_interval_to_midi_interval(tpc - hc.TPC_C) == midi_target
 
 
-def test_transpose_pitch():
-    for midi, tpc in zip(
-        range(hc.NUM_PITCHES[PitchType.MIDI]), range(hc.NUM_PITCHES[PitchType.TPC])
-    ):
-        for interval in range(-50, 50):
-            correct_midi = (midi + interval) % hc.NUM_PITCHES[PitchType.MIDI]
-            res_midi = hu.transpose_pitch(midi, interval, PitchType.MIDI)
-            assert res_midi == correct_midi
-
-            correct_tpc = tpc + interval
-            if 0 <= correct_tpc < hc.NUM_PITCHES[PitchType.TPC]:
-                res_tpc = hu.transpose_pitch(tpc, interval, PitchType.TPC)
-                assert res_tpc == correct_tpc
-            else:
+@pytest.mark.parametrize("pitch_type", [PitchType.MIDI, PitchType.TPC])
+def test_transpose_pitch(pitch_type):
+    num_pitches = hc.NUM_PITCHES[pitch_type]
+    intervals = np.arange(-50, 50)
+
+    for pitch in range(num_pitches):
+        correct = pitch + intervals
+        if pitch_type == PitchType.MIDI:
+            correct %= num_pitches
+            assert np.array_equal(hu.transpose_pitch(pitch, intervals, pitch_type), correct)
+            continue
+
+        valid = (0 <= correct) & (correct < num_pitches)
+        assert np.array_equal(
+            hu.transpose_pitch(pitch, intervals[valid], pitch_type), correct[valid]
+        )
+
+        for invalid_intervals in intervals[correct < 0], intervals[correct >= num_pitches]:
+            with pytest.raises(ValueError):
+                hu.transpose_pitch(pitch, invalid_intervals, pitch_type)
+            for interval in invalid_intervals:
                 with pytest.raises(ValueError):
-                    hu.transpose_pitch(tpc, interval, PitchType.TPC)
+                    hu.transpose_pitch(pitch, int(interval), pitch_type)
 
 
 def test_get_chord_inversion():
@@ -246,23 +230,23 @@ def test_get_chord_string_conversion():
         assert hu.get_chord_string(chord_type) == string
 
 
-def test_get_pitch_from_string():
-    for acc, adj in zip(["###", "##", "#", "", "b", "bb", "bbb"], [3, 2, 1, 0, -1, -2, -3]):
-        for pitch, midi, tpc in zip(
-            ["C", "D", "E", "F", "G", "A", "B"], [0, 2, 4, 5, 7, 9, 11], [0, 2, 4, -1, 1, 3, 5]
-        ):
-            tpc += hc.TPC_C
-            pitch += acc
+@pytest.mark.parametrize("acc, adj", ACCIDENTALS)
+def test_get_pitch_from_string(acc, adj):
+    for pitch, midi, tpc in zip(
+        ["C", "D", "E", "F", "G", "A", "B"], [0, 2, 4, 5, 7, 9, 11], [0, 2, 4, -1, 1, 3, 5]
+    ):
+        tpc += hc.TPC_C
+        pitch += acc
 
-            correct_midi = (midi + adj) % hc.NUM_PITCHES[PitchType.MIDI]
-            assert hu.get_pitch_from_string(pitch, PitchType.MIDI) == correct_midi
+        correct_midi = (midi + adj) % hc.NUM_PITCHES[PitchType.MIDI]
+        assert hu.get_pitch_from_string(pitch, PitchType.MIDI) == correct_midi
 
-            correct_tpc = tpc + adj * hc.ACCIDENTAL_ADJUSTMENT[PitchType.TPC]
-            if 0 <= correct_tpc < hc.NUM_PITCHES[PitchType.TPC]:
-                assert hu.get_pitch_from_string(pitch, PitchType.TPC) == correct_tpc
-            else:
-                with pytest.raises(ValueError):
-                    hu.get_pitch_from_string(pitch, PitchType.TPC)
+        correct_tpc = tpc + adj * hc.ACCIDENTAL_ADJUSTMENT[PitchType.TPC]
+        if 0 <= correct_tpc < hc.NUM_PITCHES[PitchType.TPC]:
+            assert hu.get_pitch_from_string(pitch, PitchType.TPC) == correct_tpc
+        else:
+            with pytest.raises(ValueError):
+                hu.get_pitch_from_string(pitch, PitchType.TPC)
 
 
 def test_get_pitch_string():
@@ -288,34 +272,26 @@ def test_get_pitch_string():
                 assert "/" in string and correct_string in string.split("/")
 
 
-def test_get_chord_label_list():
-    for pitch_type in [PitchType.MIDI, PitchType.TPC]:
-        one_hots = hu.get_chord_label_list(pitch_type, use_inversions=False)
-        i = 0
-
-        for chord_type in ChordType:
-            chord_string = hu.get_chord_string(chord_type)
-            for pitch in range(0, hc.NUM_PITCHES[pitch_type]):
-                pitch_string = hu.get_pitch_string(pitch, pitch_type)
-
-                assert one_hots[i] == f"{pitch_string}:{chord_string}"
-                i += 1
-
-        assert i == len(one_hots)
-
-    for pitch_type in [PitchType.MIDI, PitchType.TPC]:
-        one_hots = hu.get_chord_label_list(pitch_type, use_inversions=True)
-        i = 0
+@pytest.mark.parametrize("pitch_type", [PitchType.MIDI, PitchType.TPC])
+def test_get_chord_label_list(pitch_type):
+    pitch_strings = [
+        hu.get_pitch_string(pitch, pitch_type) for pitch in range(hc.NUM_PITCHES[pitch_type])
+    ]
 
-        for chord_type in ChordType:
-            chord_string = hu.get_chord_string(chord_type)
-            for pitch in range(0, hc.NUM_PITCHES[pitch_type]):
-                pitch_string = hu.get_pitch_string(pitch, pitch_type)
-                for inv in range(0, hu.get_chord_inversion_count(chord_type)):
-                    assert one_hots[i] == f"{pitch_string}:{chord_string}, inv:{inv}"
-                    i += 1
+    expected = [
+        f"{pitch_string}:{hu.get_chord_string(chord_type)}"
+        for chord_type in ChordType
+        for pitch_string in pitch_strings
+    ]
+    assert hu.get_chord_label_list(pitch_type, use_inversions=False) == expected
 
-        assert i == len(one_hots)
+    expected = [
+        f"{pitch_string}:{hu.get_chord_string(chord_type)}, inv:{inv}"
+        for chord_type in ChordType
+        for pitch_string in pitch_strings
+        for inv in range(hu.get_chord_inversion_count(chord_type))
+    ]
+    assert hu.get_chord_label_list(pitch_type, use_inversions=True) == expected
 
 
 def test_get_chord_inversion_count():
@@ -327,12 +303,11 @@ def test_get_chord_inversion_count():
 
 def test_get_chord_one_hot_index():
     for chord_type in ChordType:
+        chord_string = hu.get_chord_string(chord_type)
         for pitch_type in PitchType:
             for root_pitch in range(hc.NUM_PITCHES[pitch_type]):
+                pitch_string = hu.get_pitch_string(root_pitch, pitch_type)
                 for inversion in range(hu.get_chord_inversion_count(chord_type)):
-                    pitch_string = hu.get_pitch_string(root_pitch, pitch_type)
-                    chord_string = hu.get_chord_string(chord_type)
-
                     string_no_inv = f"{pitch_string}:{chord_string}"
                     string = f"{pitch_string}:{chord_string}, inv:{inversion}"
 
@@ -382,20 +357,60 @@ def test_get_chord_one_hot_index():
     hu.get_chord_one_hot_index(ChordType.MAJOR, 0, PitchType.TPC, inversion=3, use_inversion=False)
 
 
-def test_get_key_label_list():
-    for pitch_type in [PitchType.MIDI, PitchType.TPC]:
-        one_hots = hu.get_key_label_list(pitch_type)
-        i = 0
+def test_get_chord_one_hot_indexes():
+    for pitch_type in PitchType:
+        chords = [
+            (chord_type, root_pitch, inversion)
+            for chord_type in ChordType
+            for root_pitch in range(hc.NUM_PITCHES[pitch_type])
+            for inversion in range(hu.get_chord_inversion_count(chord_type))
+        ]
+        chord_types, root_pitches, inversions = zip(*chords)
+
+        for use_inversion in [True, False]:
+            indexes = hu.get_chord_one_hot_indexes(
+                chord_types,
+                root_pitches,
+                pitch_type,
+                inversions=inversions,
+                use_inversion=use_inversion,
+            )
+            assert list(indexes) == [
+                hu.get_chord_one_hot_index(
+                    chord_type,
+                    root_pitch,
+                    pitch_type,
+                    inversion=inversion,
+                    use_inversion=use_inversion,
+                )
+                for chord_type, root_pitch, inversion in chords
+            ]
+
+    with pytest.raises(ValueError):
+        hu.get_chord_one_hot_indexes(
+            [ChordType.MAJOR, ChordType.MINOR], [0, -1], PitchType.MIDI, inversions=[0, 0]
+        )
+    with pytest.raises(ValueError):
+        hu.get_chord_one_hot_indexes(
+            [ChordType.MAJOR, ChordType.MINOR], [0, 1], PitchType.TPC, inversions=[0, 3]
+        )
+    hu.get_chord_one_hot_indexes(
+        [ChordType.MAJOR], [0], PitchType.TPC, inversions=[3], use_inversion=False
+    )
 
-        for key_mode in KeyMode:
-            for pitch in range(0, hc.NUM_PITCHES[pitch_type]):
-                pitch_string = hu.get_pitch_string(pitch, pitch_type)
-                if key_mode == KeyMode.MINOR:
-                    pitch_string = str(pitch_string).lower()
-                assert one_hots[i] == f"{pitch_string}:{key_mode}"
-                i += 1
 
-        assert i == len(one_hots)
+@pytest.mark.parametrize("pitch_type", [PitchType.MIDI, PitchType.TPC])
+def test_get_key_label_list(pitch_type):
+    pitch_strings = [
+        str(hu.get_pitch_string(pitch, pitch_type)) for pitch in range(hc.NUM_PITCHES[pitch_type])
+    ]
+
+    expected = [
+        f"{pitch_string.lower() if key_mode == KeyMode.MINOR else pitch_string}:{key_mode}"
+        for key_mode in KeyMode
+        for pitch_string in pitch_strings
+    ]
+    assert hu.get_key_label_list(pitch_type) == expected
 
 
 def test_get_key_one_hot_index():
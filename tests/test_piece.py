@@ -3,9 +3,25 @@ from fractions import Fraction
 
 import pandas as pd
 import numpy as np
-
-from harmonic_inference.data.data_types import KeyMode, PitchType
-from harmonic_inference.data.piece import Note, Key, Chord, ScorePiece, get_reduction_mask
+import pytest
+
+from harmonic_inference.data.corpus_constants import MEASURE_OFFSET
+from harmonic_inference.data.data_types import ChordType, KeyMode, PitchType
+from harmonic_inference.data.note import get_note_array, get_note_vectors
+from harmonic_inference.data.piece import (
+    Note,
+    Key,
+    Chord,
+    ScorePiece,
+    get_chord_changes,
+    get_chord_note_input,
+    get_object_arrays,
+    get_objects_from_arrays,
+    get_range_start,
+    get_range_starts,
+    get_reduction_mask,
+    get_score_piece_from_arrays,
+)
 import harmonic_inference.utils.harmonic_constants as hc
 import harmonic_inference.utils.rhythmic_utils as ru
 import harmonic_inference.utils.harmonic_utils as hu
@@ -369,7 +385,7 @@ def test_score_piece():
     note_df = pd.DataFrame(note_dict)
     notes = [
         Note.from_series(note_row, measures_df, PitchType.TPC)
-        for _, note_row in note_df.iterrows()
+        for note_row in note_df.to_dict("records")
     ]
 
     # TODO: Some of these have repeated chords crossing key boundaries.
@@ -395,7 +411,7 @@ def test_score_piece():
     chord_df.drop(labels=2, axis='index')
     chords = [
         Chord.from_series(chord_row, measures_df, PitchType.TPC)
-        for _, chord_row in chord_df.iterrows()
+        for chord_row in chord_df.to_dict("records")
     ]
     not_none_chords = np.array([c for c in chords if c is not None])
     mask = get_reduction_mask(not_none_chords)
@@ -407,7 +423,9 @@ def test_score_piece():
             correct_chords[-1].merge_with(chord)
     not_none_chords = correct_chords
 
-    keys = [Key.from_series(chord_row, PitchType.TPC) for _, chord_row in chord_df.iterrows()]
+    keys = [
+        Key.from_series(chord_row, PitchType.TPC) for chord_row in chord_df.to_dict("records")
+    ]
     not_none_keys = [k for k in keys if k is not None]
     unique_keys = [not_none_keys[0]] + [
         k for k, k_prev in zip(not_none_keys[1:], not_none_keys[:-1]) if k != k_prev
@@ -416,11 +434,11 @@ def test_score_piece():
 
     piece = ScorePiece(note_df, chord_df, measures_df)
 
-    assert all(piece.get_inputs() == notes)
-    assert all(piece.get_chords() == not_none_chords)
-    assert all(piece.get_keys() == unique_keys)
-    assert all(piece.get_chord_change_indices() == [0, 8])
-    assert all(piece.get_key_change_indices() == [0, 1])
+    assert np.array_equal(piece.get_inputs(), notes)
+    assert np.array_equal(piece.get_chords(), not_none_chords)
+    assert np.array_equal(piece.get_keys(), unique_keys)
+    assert np.array_equal(piece.get_chord_change_indices(), [0, 8])
+    assert np.array_equal(piece.get_key_change_indices(), [0, 1])
 
     inputs = piece.get_chord_note_inputs(window=2)
     assert np.sum(inputs[0][:2]) == 0
@@ -461,3 +479,444 @@ def test_score_piece():
             dur_to_next=piece.get_duration_cache()[8],
         )
     )
+
+
+def test_get_reduction_mask():
+    def get_loop_mask(inputs, kwargs):
+        mask = np.full(len(inputs), True, dtype=bool)
+        for i, (prev_obj, next_obj) in enumerate(zip(inputs[:-1], inputs[1:])):
+            mask[i + 1] = not next_obj.is_repeated(prev_obj, **kwargs)
+        return mask
+
+    rng = np.random.default_rng(0)
+    chord_types = list(hc.CHORD_PITCHES[PitchType.TPC].keys())
+
+    chords = [
+        Chord(
+            rng.integers(2),
+            0,
+            0,
+            KeyMode.MAJOR,
+            chord_types[rng.integers(2)],
+            rng.integers(2),
+            (0, Fraction(0)),
+            0,
+            (0, Fraction(1)),
+            0,
+            Fraction(1),
+            PitchType.TPC,
+            suspension=[None, "4"][rng.integers(2)],
+        )
+        for _ in range(50)
+    ]
+    for kwargs in [{}, {"use_inversion": False}, {"use_suspension": True}]:
+        assert np.array_equal(get_reduction_mask(chords, kwargs), get_loop_mask(chords, kwargs))
+
+    keys = [
+        Key(
+            rng.integers(2),
+            rng.integers(2),
+            0,
+            KeyMode(rng.integers(2)),
+            KeyMode(rng.integers(2)),
+            KeyMode.MAJOR,
+            PitchType.TPC,
+        )
+        for _ in range(50)
+    ]
+    for kwargs in [{"use_relative": True}, {"use_relative": False}]:
+        assert np.array_equal(get_reduction_mask(keys, kwargs), get_loop_mask(keys, kwargs))
+
+    assert np.array_equal(get_reduction_mask(chords[:1] + keys[:1]), [True, True])
+    assert len(get_reduction_mask([])) == 0
+
+
+def test_get_range_starts():
+    rng = np.random.default_rng(0)
+    notes = []
+    for _ in range(100):
+        onset = (int(rng.integers(10)), Fraction(int(rng.integers(4)), 4))
+        offset = (onset[0] + int(rng.integers(3)), Fraction(int(rng.integers(4)), 4))
+        notes.append(Note(0, 4, onset, 0, Fraction(1), max(onset, offset), 0, PitchType.TPC))
+    notes.sort(key=lambda note: note.onset)
+
+    onsets = [(mc, Fraction(beat, 8)) for mc in range(-1, 14) for beat in range(8)]
+    assert get_range_starts(onsets, notes) == [get_range_start(onset, notes) for onset in onsets]
+    assert get_range_starts(onsets, []) == [0] * len(onsets)
+
+
+def test_get_chord_changes():
+    def get_loop_changes(chord_onsets, notes):
+        chord_changes = np.zeros(len(chord_onsets), dtype=int)
+        note_index = 0
+        for chord_index, chord_onset in enumerate(chord_onsets):
+            while note_index + 1 < len(notes) and notes[note_index].onset < chord_onset:
+                note_index += 1
+            chord_changes[chord_index] = note_index
+        return chord_changes
+
+    rng = np.random.default_rng(0)
+    onsets = [(int(rng.integers(10)), Fraction(int(rng.integers(4)), 4)) for _ in range(50)]
+    chord_onsets = sorted((mc, Fraction(beat, 2)) for mc in range(-1, 12) for beat in range(2))
+
+    for note_onsets in [sorted(onsets), onsets]:
+        notes = [
+            Note(0, 4, onset, 0, Fraction(1), onset, 0, PitchType.TPC) for onset in note_onsets
+        ]
+        assert np.array_equal(
+            get_chord_changes(chord_onsets, notes), get_loop_changes(chord_onsets, notes)
+        )
+
+    assert np.array_equal(get_chord_changes(chord_onsets, []), np.zeros(len(chord_onsets)))
+
+
+def test_score_piece_arrays(tmp_path):
+    measures_df = pd.DataFrame({
+        'mc': [0, 1],
+        'next': [1, pd.NA],
+        'act_dur': [Fraction(1), Fraction(1)],
+        MEASURE_OFFSET: [Fraction(0), Fraction(0)],
+    })
+    notes = [
+        Note(0, 4, (0, Fraction(0)), 0, Fraction(1, 2), (0, Fraction(1, 2)), 1, PitchType.TPC),
+        Note(4, 4, (0, Fraction(1, 2)), 1, Fraction(3, 2), (1, Fraction(1)), 0, PitchType.TPC),
+    ]
+    chords = [
+        Chord(
+            0,
+            0,
+            0,
+            KeyMode.MAJOR,
+            ChordType.MAJOR,
+            0,
+            (0, Fraction(0)),
+            0,
+            (1, Fraction(0)),
+            0,
+            Fraction(1),
+            PitchType.TPC,
+            suspension=suspension,
+        )
+        for suspension in [None, "4"]
+    ]
+    keys = [Key(0, 0, 0, KeyMode.MAJOR, KeyMode.MAJOR, KeyMode.MAJOR, PitchType.TPC)]
+
+    for objects, object_class in [(notes, Note), (chords, Chord), (keys, Key), ([], Note)]:
+        arrays = get_object_arrays(objects, "test")
+        assert get_objects_from_arrays(arrays, "test", object_class) == objects
+
+    piece = ScorePiece(measures_df, notes, chords, keys, [0, 1], [(0, 1), (1, 2)], [0])
+    piece.save_arrays(tmp_path / "piece.npz")
+    loaded = get_score_piece_from_arrays(measures_df, tmp_path / "piece.npz")
+    assert list(loaded.get_inputs()) == notes
+    assert list(loaded.get_chords()) == chords
+    assert list(loaded.get_keys()) == keys
+    assert np.array_equal(loaded.get_chord_change_indices(), [0, 1])
+    assert np.array_equal(loaded.get_chord_ranges(), [(0, 1), (1, 2)])
+    assert np.array_equal(loaded.get_key_change_indices(), [0])
+
+    piece = ScorePiece(measures_df, notes, None, None, None, None, None)
+    loaded = get_score_piece_from_arrays(measures_df, piece.to_arrays())
+    assert list(loaded.get_inputs()) == notes
+    assert loaded.get_chords() is None
+
+
+def test_get_note_array():
+    rng = np.random.default_rng(0)
+    for pitch_type in PitchType:
+        notes = [
+            Note(
+                int(rng.integers(hc.NUM_PITCHES[pitch_type])),
+                int(rng.integers(1, 8)),
+                (0, Fraction(0)),
+                int(rng.integers(4)),
+                Fraction(1),
+                (1, Fraction(0)),
+                int(rng.integers(4)),
+                pitch_type,
+            )
+            for _ in range(20)
+        ]
+        note_array = get_note_array(notes)
+        assert list(note_array["pitch_class"]) == [note.pitch_class for note in notes]
+        assert list(note_array["octave"]) == [note.octave for note in notes]
+        assert list(note_array["onset_level"]) == [note.onset_level for note in notes]
+        assert list(note_array["offset_level"]) == [note.offset_level for note in notes]
+        assert list(note_array["midi_note_number"]) == [
+            note.get_midi_note_number() for note in notes
+        ]
+
+    assert len(get_note_array([])) == 0
+
+
+def test_get_note_vectors():
+    rng = np.random.default_rng(0)
+    for pitch_type in PitchType:
+        notes = [
+            Note(
+                int(rng.integers(hc.NUM_PITCHES[pitch_type])),
+                int(rng.integers(1, 8)),
+                (0, Fraction(0)),
+                int(rng.integers(4)),
+                Fraction(1),
+                (1, Fraction(0)),
+                int(rng.integers(4)),
+                pitch_type,
+            )
+            for _ in range(20)
+        ]
+        pitches = [(note.octave, note.get_midi_note_number()) for note in notes]
+        dur_from_prev = [None] + [Fraction(int(rng.integers(1, 4)), 4) for _ in notes[1:]]
+        dur_to_next = dur_from_prev[1:] + [None]
+
+        for min_pitch, max_pitch in [(None, None), (min(pitches), max(pitches))]:
+            vectors = get_note_vectors(
+                notes,
+                dur_from_prev=dur_from_prev,
+                dur_to_next=dur_to_next,
+                min_pitch=min_pitch,
+                max_pitch=max_pitch,
+            )
+            to_vecs = np.vstack(
+                [
+                    note.to_vec(
+                        min_pitch=min_pitch,
+                        max_pitch=max_pitch,
+                        dur_from_prev=prev,
+                        dur_to_next=next_,
+                    )
+                    for note, prev, next_ in zip(notes, dur_from_prev, dur_to_next)
+                ]
+            )
+            assert np.array_equal(vectors, to_vecs)
+
+        # An octave past the one-hot range (MIDI 120-127) raises, like Note.to_vec
+        high_note = Note(0, 10, (0, Fraction(0)), 0, Fraction(1), (1, Fraction(0)), 0, pitch_type)
+        high_notes = [notes[0], high_note]
+        min_pitch = (notes[0].octave, notes[0].get_midi_note_number())
+        max_pitch = (high_note.octave, high_note.get_midi_note_number())
+        with pytest.raises(IndexError):
+            high_note.to_vec(min_pitch=min_pitch, max_pitch=max_pitch)
+        with pytest.raises(IndexError):
+            get_note_vectors(high_notes, min_pitch=min_pitch, max_pitch=max_pitch)
+
+
+def test_get_chord_note_input():
+    def get_to_vec_chord_input(
+        notes,
+        measures,
+        chord_onset,
+        chord_offset,
+        chord_duration,
+        change_index,
+        onset_index,
+        offset_index,
+        window,
+        duration_cache,
+        chord=None,
+    ):
+        # The note-by-note Note.to_vec version of get_chord_note_input
+        chord_onset_aligns = chord is None or chord.onset == chord_onset
+        chord_offset_aligns = chord is None or chord.offset == chord_offset
+
+        window_onset_index = onset_index - window
+        window_offset_index = offset_index + window
+        first_note_index = max(window_onset_index, 0)
+        last_note_index = min(window_offset_index, len(notes))
+        chord_notes = notes[first_note_index:last_note_index]
+
+        dur_from_prevs = ([None] + list(duration_cache))[first_note_index:last_note_index]
+        dur_to_nexts = list(duration_cache)[first_note_index:last_note_index]
+
+        pitch_list = [(note.octave, note.get_midi_note_number()) for note in chord_notes]
+
+        if not chord_onset_aligns:
+            note_onsets = [None] * len(chord_notes)
+        else:
+            note_onsets = []
+            for note_index in range(first_note_index, last_note_index):
+                if note_index < change_index:
+                    note_onsets.append(-np.sum(duration_cache[note_index:change_index]))
+                elif note_index > change_index:
+                    note_onsets.append(np.sum(duration_cache[change_index:note_index]))
+                else:
+                    note_onsets.append(Fraction(0))
+
+        note_vectors = np.vstack(
+            [
+                note.to_vec(
+                    chord_onset=chord_onset if chord_onset_aligns else chord.onset,
+                    chord_offset=chord_offset if chord_offset_aligns else chord.offset,
+                    chord_duration=chord_duration,
+                    measures_df=measures,
+                    min_pitch=min(pitch_list),
+                    max_pitch=max(pitch_list),
+                    note_onset=note_onset,
+                    dur_from_prev=from_prev,
+                    dur_to_next=to_next,
+                )
+                for note, note_onset, from_prev, to_next in zip(
+                    chord_notes, note_onsets, dur_from_prevs, dur_to_nexts
+                )
+            ]
+        )
+
+        chord_input = np.zeros((window_offset_index - window_onset_index, note_vectors.shape[1]))
+        start = first_note_index - window_onset_index
+        end = len(chord_input) - (window_offset_index - last_note_index)
+        chord_input[start:end] = note_vectors
+        return chord_input
+
+    measures_df = pd.DataFrame({
+        'mc': list(range(4)),
+        'timesig': '4/4',
+        'act_dur': Fraction(1),
+        MEASURE_OFFSET: Fraction(0),
+        'next': list(range(1, 4)) + [-1],
+    })
+    measures = ru.get_measures_dict(measures_df)
+
+    # Quarter notes (and some triplets) over 3 measures, across several octaves
+    onsets = [(mc, Fraction(beat, 4)) for mc in range(2) for beat in range(4)] + [
+        (2, Fraction(beat, 6)) for beat in range(6)
+    ]
+    offsets = onsets[1:] + [(3, Fraction(0))]
+    notes = [
+        Note(
+            (5 * i) % hc.NUM_PITCHES[PitchType.MIDI],
+            2 + (3 * i) % 5,
+            onset,
+            i % 4,
+            ru.get_range_length(onset, offset, measures),
+            offset,
+            (i + 1) % 4,
+            PitchType.MIDI,
+        )
+        for i, (onset, offset) in enumerate(zip(onsets, offsets))
+    ]
+
+    piece = ScorePiece(measures_df, notes, None, None, None, None, None, measures=measures)
+    duration_cache = piece.get_duration_cache()
+    assert piece.onset_ticks is not None
+
+    # A chord whose own onset and offset do not align with the range it is given
+    unaligned_chord = Chord(
+        0,
+        0,
+        0,
+        KeyMode.MAJOR,
+        ChordType.MAJOR,
+        0,
+        (1, Fraction(1, 8)),
+        0,
+        (2, Fraction(1, 2)),
+        0,
+        ru.get_range_length((1, Fraction(1, 8)), (2, Fraction(1, 2)), measures),
+        PitchType.MIDI,
+    )
+
+    # chord_onset, chord_offset, change_index, onset_index, offset_index, chord
+    cases = [
+        # Chord-aligned, windows running past both ends of the piece
+        ((0, Fraction(0)), (1, Fraction(0)), 0, 0, 4, None),
+        ((2, Fraction(1, 2)), (3, Fraction(0)), 11, 11, 14, None),
+        # Chord-aligned in the middle of the piece
+        ((1, Fraction(1, 4)), (2, Fraction(1, 3)), 5, 4, 10, None),
+        # Not chord-aligned: note onsets are computed from the measures
+        ((1, Fraction(1, 4)), (2, Fraction(1, 3)), 5, 4, 10, unaligned_chord),
+    ]
+
+    for chord_onset, chord_offset, change_index, onset_index, offset_index, chord in cases:
+        chord_duration = ru.get_range_length(chord_onset, chord_offset, measures)
+
+        # Zero duration chords use the fallback proportions
+        for duration in [chord_duration, Fraction(0)]:
+            for window in [0, 2, 6]:
+                args = (
+                    notes,
+                    measures,
+                    chord_onset,
+                    chord_offset,
+                    duration,
+                    change_index,
+                    onset_index,
+                    offset_index,
+                    window,
+                    duration_cache,
+                )
+                if duration == 0 and chord is not None:
+                    # Without aligned note onsets there is no fallback: both raise
+                    with pytest.raises(ZeroDivisionError):
+                        get_to_vec_chord_input(*args, chord=chord)
+                    with pytest.raises(ZeroDivisionError):
+                        get_chord_note_input(*args, chord=chord)
+                    continue
+
+                correct = get_to_vec_chord_input(*args, chord=chord)
+                assert np.array_equal(get_chord_note_input(*args, chord=chord), correct)
+                assert np.array_equal(
+                    get_chord_note_input(
+                        *args,
+                        chord=chord,
+                        onset_ticks=piece.onset_ticks,
+                        ticks_per_whole_note=piece.ticks_per_whole_note,
+                        note_array=get_note_array(notes),
+                    ),
+                    correct,
+                )
+
+    # The cached ground-truth chord inputs are shared between calls, so they are read-only
+    chord = Chord(
+        0,
+        0,
+        0,
+        KeyMode.MAJOR,
+        ChordType.MAJOR,
+        0,
+        onsets[0],
+        0,
+        offsets[-1],
+        0,
+        ru.get_range_length(onsets[0], offsets[-1], measures),
+        PitchType.MIDI,
+    )
+    piece = ScorePiece(
+        measures_df, notes, [chord], None, [0], [(0, len(notes))], None, measures=measures
+    )
+    chord_inputs = piece.get_chord_note_inputs(window=2)
+    assert piece.get_chord_note_inputs(window=2)[0] is chord_inputs[0]
+    with pytest.raises(ValueError):
+        chord_inputs[0][0, 0] = 1
+
+    # Notes below min_pitch's octave have a negative relative octave
+    min_pitch = (5, 60)
+    max_pitch = (6, 79)
+    note_onsets = [Fraction(i, 8) - Fraction(1, 2) for i in range(len(notes))]
+    vectors = get_note_vectors(
+        notes,
+        chord_onset=(1, Fraction(0)),
+        chord_offset=(2, Fraction(0)),
+        chord_duration=Fraction(1),
+        measures_df=measures,
+        min_pitch=min_pitch,
+        max_pitch=max_pitch,
+        note_onsets=note_onsets,
+    )
+    assert any(note.octave < min_pitch[0] for note in notes)
+    assert np.array_equal(
+        vectors,
+        np.vstack(
+            [
+                note.to_vec(
+                    chord_onset=(1, Fraction(0)),
+                    chord_offset=(2, Fraction(0)),
+                    chord_duration=Fraction(1),
+                    measures_df=measures,
+                    min_pitch=min_pitch,
+                    max_pitch=max_pitch,
+                    note_onset=note_onset,
+                )
+                for note, note_onset in zip(notes, note_onsets)
+            ]
+        ),
+    )
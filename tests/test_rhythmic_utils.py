@@ -4,6 +4,7 @@ import math
 
 import pandas as pd
 
+from harmonic_inference.data.corpus_constants import MEASURE_OFFSET
 import harmonic_inference.utils.rhythmic_utils as ru
 
 
@@ -103,6 +104,51 @@ def test_get_range_length():
                             assert length == -correct_length
 
 
+def test_build_measure_offset_cache():
+    # Measure 2 is skipped by the "next" pointers, and measure 0 is a pick-up
+    measures = pd.DataFrame({
+        'mc': [0, 1, 2, 3, 4],
+        'next': [1, 3, 3, 4, pd.NA],
+        'act_dur': [Fraction(1, 4), Fraction(1), Fraction(1), Fraction(3, 4), Fraction(1)],
+        MEASURE_OFFSET: [Fraction(3, 4), Fraction(0), Fraction(0), Fraction(0), Fraction(0)],
+    })
+
+    offset_cache = ru.build_measure_offset_cache(measures)
+    assert offset_cache == {0: Fraction(-3, 4), 1: Fraction(1, 4), 3: Fraction(5, 4), 4: 2}
+
+    measures_dict = ru.get_measures_dict(measures)
+    assert ru.build_measure_offset_cache(measures_dict) == offset_cache
+    assert ru.get_measure(measures_dict, 3)['act_dur'] == ru.get_measure(measures, 3)['act_dur']
+
+    positions = [(mc, Fraction(beat, 8)) for mc in [0, 1, 3, 4] for beat in range(8)]
+    positions = [(mc, beat) for mc, beat in positions if mc != 0 or beat >= Fraction(3, 4)]
+    for start in positions:
+        for end in positions:
+            if end < start:
+                continue
+            length = ru.get_range_length(start, end, measures)
+            assert length == ru.get_range_length(start, end, measures_dict)
+            assert length == ru.get_range_length(start, end, measures, offset_cache=offset_cache)
+            assert -length == ru.get_range_length(end, start, measures, offset_cache=offset_cache)
+
+    # Measures which are not in the cache fall back to the measures DataFrame
+    assert ru.get_range_length((2, 0), (3, 0), measures, offset_cache=offset_cache) == 1
+
+
+def test_get_position_ticks():
+    assert ru.get_ticks_per_whole_note([]) == 1
+    assert ru.get_ticks_per_whole_note([Fraction(1, 4), Fraction(1, 6), 2]) == 12
+    assert ru.to_ticks(Fraction(3, 4), 12) == 9
+    assert ru.to_ticks(2, 12) == 24
+
+    offset_cache = {0: Fraction(-3, 4), 1: Fraction(1, 4), 3: Fraction(5, 4)}
+    positions = [(0, Fraction(3, 4)), (1, Fraction(1, 6)), (3, Fraction(0)), (1, Fraction(1, 2))]
+    ticks, ticks_per_whole_note = ru.get_position_ticks(positions, offset_cache)
+    assert ticks_per_whole_note == 12
+    for (mc, beat), position_ticks in zip(positions, ticks):
+        assert Fraction(position_ticks, ticks_per_whole_note) == offset_cache[mc] + beat
+
+
 def test_get_rhythmic_info_as_proportion_of_range():
     # note, range_start, range_end, measures, range_len=None
     # note has duration, mc, onset
@@ -230,3 +276,27 @@ def test_get_metrical_level():
             level = ru.get_metrical_level(measure_length,
                                           pd.Series([time_sig, 0], index=['timesig', 'offset']))
             assert level == 3, "Next downbeat is not detected correctly"
+
+
+def test_get_metrical_level_table():
+    for time_sig in ["2/2", "3/4", "4/4", "5/8", "6/8", "9/8", "12/16"]:
+        measure_length, beat_length, sub_beat_length = ru.get_metrical_level_lengths(time_sig)
+        table_sub_beat_length, level_table = ru.get_metrical_level_table(time_sig)
+
+        assert table_sub_beat_length == sub_beat_length
+        assert len(level_table) * sub_beat_length == measure_length
+        assert level_table[0] == 3
+        assert level_table[int(beat_length / sub_beat_length)] == 2
+        assert level_table[1] == 1
+
+        # Negative beats, beats past the measure end, and non-rational beats
+        measure = {"timesig": time_sig}
+        for beat in [-beat_length, -sub_beat_length / 2, 2 * measure_length + beat_length]:
+            if beat % beat_length == 0:
+                correct_level = 2
+            elif beat % sub_beat_length == 0:
+                correct_level = 1
+            else:
+                correct_level = 0
+            assert ru.get_metrical_level(beat, measure) == correct_level
+            assert ru.get_metrical_level(float(beat), measure) == correct_level